@@ -4,9 +4,15 @@ import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
+import numpy as np
 from datetime import date
 from src.database import DatabaseManager, Machine, Scenario
-from src.calculator import RevenueCalculator
+from src.calculator import RevenueCalculator, machine_columns
+
+try:
+    import duckdb
+except ImportError:  # duckdb is optional; aggregation then falls back to pandas
+    duckdb = None
 
 # Utility function for number formatting
 def format_number(num):
@@ -24,6 +30,35 @@ def format_percentage(num):
     """Format percentage with 2 decimals"""
     return f"{num:.2f}%"
 
+# Largest-Triangle-Three-Buckets downsampling for long chart series
+MAX_TRACE_POINTS = 500  # per trace; the 60-month projection maximum stays well below
+
+def lttb_indices(x, y, n_out):
+    """Return the indices of the n_out points of (x, y) that LTTB keeps"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Keep the point of the current bucket forming the largest triangle
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                       - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        indices[i + 1] = a
+    return indices
+
 # Page configuration
 st.set_page_config(
     page_title="Revenue Model",
@@ -31,25 +66,13 @@ st.set_page_config(
     layout="wide"
 )
 
-# Custom CSS to reduce top padding and fix tabs
+# Custom CSS to reduce top padding
 st.markdown("""
     <style>
         .block-container {
             padding-top: 2rem;
             padding-bottom: 0rem;
         }
-        /* Make tabs more visible and add spacing */
-        .stTabs [data-baseweb="tab-list"] {
-            gap: 8px;
-            padding-top: 1rem;
-            padding-bottom: 1rem;
-        }
-        .stTabs [data-baseweb="tab"] {
-            height: 50px;
-            padding-left: 20px;
-            padding-right: 20px;
-            font-size: 16px;
-        }
     </style>
     """, unsafe_allow_html=True)
 
@@ -62,6 +85,228 @@ def init_db():
 
 db = init_db()
 
+def aggregate_with_duckdb(all_projections):
+    """Per date/machine/currency sums of the projections in one DuckDB pass"""
+    con = duckdb.connect()
+    try:
+        con.register('projections', all_projections)
+        agg = con.execute("""
+            SELECT date, machine_name, currency,
+                   SUM(aum) AS aum,
+                   SUM(aum_usd) AS aum_usd,
+                   SUM(management_fee_usd) AS management_fee_usd,
+                   SUM(performance_fee_usd) AS performance_fee_usd,
+                   SUM(total_fee_usd) AS total_fee_usd
+            FROM projections
+            GROUP BY ALL
+        """).df()
+    finally:
+        con.close()
+
+    # DuckDB hands DATE back as datetime64; keep the calculator's date objects
+    agg['date'] = agg['date'].dt.date
+    return agg
+
+# Projections and aggregations, cached on machine parameters + prices + months
+@st.cache_data(max_entries=32)
+def compute_projections(machine_cols, names, currencies, launch_dates, eth_price, btc_price, months):
+    """Calculate projections for all machines plus the aggregations used by the tabs"""
+    scenario = Scenario(eth_price=eth_price, btc_price=btc_price)
+
+    calculator = RevenueCalculator(months=months)
+    all_projections = calculator.calculate_projections(machine_cols, names, currencies, launch_dates, scenario)
+
+    # Low-cardinality labels repeated every month: categorical codes instead of strings
+    all_projections['machine_name'] = all_projections['machine_name'].astype('category')
+    all_projections['currency'] = all_projections['currency'].astype('category')
+
+    # Single pass over the projections; every view below is derived from this frame
+    if duckdb is not None and not all_projections.empty:
+        agg = aggregate_with_duckdb(all_projections)
+    else:
+        agg = all_projections.groupby(['date', 'machine_name', 'currency'], sort=False, observed=True).agg(
+            aum=('aum', 'sum'),
+            aum_usd=('aum_usd', 'sum'),
+            management_fee_usd=('management_fee_usd', 'sum'),
+            performance_fee_usd=('performance_fee_usd', 'sum'),
+            total_fee_usd=('total_fee_usd', 'sum')
+        ).reset_index()
+
+    # Date groupings keep sort=True so the views stay in chronological order
+    fees_by_date = agg.groupby('date', as_index=False)[
+        ['management_fee_usd', 'performance_fee_usd', 'total_fee_usd', 'aum_usd']
+    ].sum()
+    aum_by_currency = agg.groupby(['date', 'currency'], as_index=False, observed=True)[['aum', 'aum_usd']].sum()
+
+    # Fee % and yearly views only need per-date totals
+    fee_pct_data = calculator.calculate_fee_percentage(fees_by_date, agg=fees_by_date)
+    yearly_data = calculator.aggregate_by_year(fees_by_date)
+
+    if fees_by_date.empty:
+        total_aum = 0.0
+        total_fees_monthly = 0.0
+    else:
+        total_aum = fees_by_date['aum_usd'].iloc[-1]
+        total_fees_monthly = fees_by_date['total_fee_usd'].iloc[-1]
+
+    return all_projections, aum_by_currency, fees_by_date, fee_pct_data, yearly_data, total_aum, total_fees_monthly
+
+# Dashboard figures, cached as built go.Figure objects. cache_resource hands back
+# the same object without pickling, so plotly's per-attribute validation runs
+# once per distinct dataset instead of on every rerun
+@st.cache_resource(max_entries=32)
+def aum_by_currency_figure(aum_by_currency):
+    """Stacked AUM area chart by currency"""
+    # Create stacked area chart
+    fig_aum = go.Figure()
+
+    # Define color scheme for currencies
+    currency_colors = {
+        'USD': '#2ecc71',  # Green
+        'ETH': '#3498db',  # Blue
+        'BTC': '#f39c12'   # Orange
+    }
+
+    # Partition by currency once, then add traces in a consistent stacking order
+    # Scattergl has no stackgroup, so stack manually: y is the running total,
+    # customdata keeps each trace's own AUM for the hover label
+    currency_groups = dict(list(aum_by_currency.groupby('currency', sort=False, observed=True)))
+    stacked_aum = 0
+    for currency in ['BTC', 'ETH', 'USD']:
+        if currency in currency_groups:
+            currency_data = currency_groups[currency]
+            stacked_aum = stacked_aum + currency_data['aum_usd'].to_numpy()
+            fig_aum.add_trace(go.Scattergl(
+                x=currency_data['date'],
+                y=stacked_aum,
+                customdata=currency_data['aum_usd'],
+                name=currency,
+                mode='lines',
+                fill='tonexty',
+                fillcolor=currency_colors.get(currency, '#95a5a6'),
+                line=dict(width=0.5, color=currency_colors.get(currency, '#95a5a6')),
+                hovertemplate='%{customdata:,.2f}<extra></extra>'
+            ))
+
+    fig_aum.update_layout(
+        xaxis_title="Date",
+        yaxis_title="AUM (USD)",
+        hovermode='x unified',
+        height=500,
+        yaxis=dict(tickformat=',.0f')
+    )
+    return fig_aum
+
+@st.cache_resource(max_entries=32)
+def aum_by_machine_figure(all_projections):
+    """Stacked AUM area chart by machine"""
+    # Create stacked area chart by machine
+    fig_aum_machine = go.Figure()
+
+    # Get unique machines and assign colors
+    unique_machines = all_projections['machine_name'].unique()
+    # Generate enough colors by cycling through multiple color sets if needed
+    all_colors = (px.colors.qualitative.Set3 +
+                 px.colors.qualitative.Pastel +
+                 px.colors.qualitative.Set2 +
+                 px.colors.qualitative.Set1)
+    machine_colors = [all_colors[i % len(all_colors)] for i in range(len(unique_machines))]
+
+    # One column per machine (rows sharing a name are summed), rows in date order
+    aum_wide = all_projections.pivot_table(
+        index='date', columns='machine_name', values='aum_usd',
+        aggfunc='sum', observed=True, sort=False
+    ).reindex(columns=unique_machines)
+    dates = aum_wide.index.to_numpy()
+
+    # Long windows only: downsample every trace at the same LTTB points
+    # (picked on the stacked total) so the stack stays aligned. The machine
+    # count never drops real monthly points
+    keep = slice(None)
+    if len(dates) > MAX_TRACE_POINTS:
+        keep = lttb_indices(pd.to_datetime(dates).asi8.astype(float),
+                            aum_wide.sum(axis=1).to_numpy(dtype=float),
+                            MAX_TRACE_POINTS)
+    machine_aum = aum_wide.to_numpy()[keep]
+    stacked_aum = machine_aum.cumsum(axis=1)
+
+    for j, (machine_name, color) in enumerate(zip(aum_wide.columns, machine_colors)):
+        fig_aum_machine.add_trace(go.Scattergl(
+            x=dates[keep],
+            y=stacked_aum[:, j],
+            customdata=machine_aum[:, j],
+            name=machine_name,
+            mode='lines',
+            fill='tonexty',
+            fillcolor=color,
+            line=dict(width=0.5, color=color),
+            hovertemplate='%{customdata:,.2f}<extra></extra>'
+        ))
+
+    fig_aum_machine.update_layout(
+        xaxis_title="Date",
+        yaxis_title="AUM (USD)",
+        hovermode='x unified',
+        height=500,
+        yaxis=dict(tickformat=',.0f')
+    )
+    return fig_aum_machine
+
+@st.cache_resource(max_entries=32)
+def fees_figure(fees_by_date):
+    """Management vs performance fees stacked bar chart"""
+    fig_fees = go.Figure()
+    fig_fees.add_trace(go.Bar(
+        x=fees_by_date['date'],
+        y=fees_by_date['management_fee_usd'],
+        name='Management Fees',
+        marker_color='#2ecc71',
+        hovertemplate='%{y:,.2f}<extra></extra>'
+    ))
+    fig_fees.add_trace(go.Bar(
+        x=fees_by_date['date'],
+        y=fees_by_date['performance_fee_usd'],
+        name='Performance Fees',
+        marker_color='#3498db',
+        hovertemplate='%{y:,.2f}<extra></extra>'
+    ))
+
+    fig_fees.update_layout(
+        barmode='stack',
+        xaxis_title="Date",
+        yaxis_title="Fees (USD)",
+        hovermode='x unified',
+        height=400,
+        yaxis=dict(tickformat=',.0f')
+    )
+    return fig_fees
+
+@st.cache_resource(max_entries=32)
+def fee_pct_figure(fee_pct_data):
+    """Annualized fee % to AUM line chart"""
+    fig_fee_pct = go.Figure()
+    fig_fee_pct.add_trace(go.Scattergl(
+        x=fee_pct_data['date'],
+        y=fee_pct_data['fee_pct_annualized'],
+        name='Fee %',
+        mode='lines+markers',
+        line=dict(width=2, color='#e74c3c'),
+        hovertemplate='%{y:.2f}%<extra></extra>'
+    ))
+
+    fig_fee_pct.update_layout(
+        xaxis_title="Date",
+        yaxis_title="Fee % (Annualized)",
+        yaxis=dict(
+            range=[0, 1],
+            tickformat='.2f',
+            ticksuffix='%'
+        ),
+        hovermode='x unified',
+        height=400
+    )
+    return fig_fee_pct
+
 # Sidebar - Scenario and General Inputs
 with st.sidebar:
     # Title in sidebar
@@ -124,23 +369,22 @@ with st.sidebar:
 
     if apply_to_all and st.button("Update All Machines"):
         session_update = db.get_session()
-        machines_to_update = session_update.query(Machine).filter_by(scenario_id=selected_scenario.id).all()
+        scenario_machines = session_update.query(Machine).filter_by(scenario_id=selected_scenario.id)
 
-        for machine in machines_to_update:
-            # Apply yield based on currency (convert from % to decimal)
-            if machine.currency == 'ETH':
-                machine.yield_apr = yield_eth / 100
-            elif machine.currency == 'USD':
-                machine.yield_apr = yield_usd / 100
-            elif machine.currency == 'BTC':
-                machine.yield_apr = yield_btc / 100
+        # Growth rate for every machine, whatever its currency (convert from % to decimal)
+        updated_count = scenario_machines.update(
+            {'monthly_growth_rate': subscription_growth / 100}, synchronize_session=False
+        )
 
-            # Apply growth rate (convert from % to decimal)
-            machine.monthly_growth_rate = subscription_growth / 100
+        # Yield by currency: one UPDATE per currency that has a yield input
+        for currency, yield_pct in [('ETH', yield_eth), ('USD', yield_usd), ('BTC', yield_btc)]:
+            scenario_machines.filter_by(currency=currency).update(
+                {'yield_apr': yield_pct / 100}, synchronize_session=False
+            )
 
         session_update.commit()
         session_update.close()
-        st.success(f"✅ Updated {len(machines_to_update)} machines!")
+        st.success(f"✅ Updated {updated_count} machines!")
         st.rerun()
 
     st.markdown("**Projection Settings**")
@@ -152,12 +396,14 @@ with st.sidebar:
 
     with col1:
         if st.button("💾 Save as Default"):
-            st.session_state.default_eth_price = st.session_state.eth_price
-            st.session_state.default_btc_price = st.session_state.btc_price
-            st.session_state.default_yield_eth = yield_eth
-            st.session_state.default_yield_usd = yield_usd
-            st.session_state.default_yield_btc = yield_btc
-            st.session_state.default_subscription_growth = subscription_growth
+            st.session_state.update({
+                'default_eth_price': st.session_state.eth_price,
+                'default_btc_price': st.session_state.btc_price,
+                'default_yield_eth': yield_eth,
+                'default_yield_usd': yield_usd,
+                'default_yield_btc': yield_btc,
+                'default_subscription_growth': subscription_growth,
+            })
             # Save current machines snapshot
             try:
                 st.session_state.default_machines_snapshot = db.save_machines_snapshot(selected_scenario.id)
@@ -187,39 +433,39 @@ with st.sidebar:
     session.close()
 
 # Main content
-tab1, tab2, tab3 = st.tabs(["📊 Dashboard", "⚙️ Machines", "📈 Yearly View"])
-
-# Calculate projections - use a fresh session
+# Calculate projections - use a fresh session. Prices come straight from the
+# sidebar values; the scenario row is not reloaded or modified here
 session = db.get_session()
-selected_scenario = session.query(Scenario).filter_by(id=scenario_id).first()
-
-# Override with session state values (for real-time updates)
-selected_scenario.eth_price = current_eth_price
-selected_scenario.btc_price = current_btc_price
-
 machines = session.query(Machine).filter_by(scenario_id=scenario_id).all()
 
 # Extract data before closing session
 machines_list = list(machines)
 
-calculator = RevenueCalculator(months=projection_months)
-all_projections = calculator.calculate_all_machines(machines_list, selected_scenario)
+# Columnar (struct-of-arrays) view of the machines for the calculator
+machine_cols = machine_columns(machines_list)
+machine_names = [m.name for m in machines_list]
+machine_currencies = [m.currency for m in machines_list]
+machine_launch_dates = [m.launch_date for m in machines_list]
+
+(all_projections, aum_by_currency, fees_by_date, fee_pct_data, yearly_data,
+ total_aum, total_fees_monthly) = compute_projections(
+    machine_cols, machine_names, machine_currencies, machine_launch_dates,
+    current_eth_price, current_btc_price, projection_months
+)
 
 # Close session after getting all needed data
 session.close()
 
 # TAB 1: Dashboard
-with tab1:
+def render_dashboard(all_projections, aum_by_currency, fees_by_date, fee_pct_data,
+                     total_aum, total_fees_monthly):
     if all_projections.empty:
         st.warning("No machines configured. Please add machines in the Machines tab.")
     else:
         # Key Metrics Row
         col1, col2, col3, col4 = st.columns(4)
 
-        total_aum = all_projections.groupby('date')['aum_usd'].sum().iloc[-1]
-        total_fees_monthly = all_projections.groupby('date')['total_fee_usd'].sum().iloc[-1]
         total_fees_annual = total_fees_monthly * 12
-        fee_pct_data = calculator.calculate_fee_percentage(all_projections)
         avg_fee_pct = fee_pct_data['fee_pct_annualized'].mean()
 
         with col1:
@@ -235,230 +481,117 @@ with tab1:
 
         # AUM Stacked Area Chart by Currency
         st.subheader("Total AUM Over Time (USD) - By Currency")
-        aum_by_currency = calculator.aggregate_by_currency(all_projections)
-
-        # Create stacked area chart
-        fig_aum = go.Figure()
-
-        # Define color scheme for currencies
-        currency_colors = {
-            'USD': '#2ecc71',  # Green
-            'ETH': '#3498db',  # Blue
-            'BTC': '#f39c12'   # Orange
-        }
-
-        # Sort currencies for consistent stacking order
-        for currency in ['BTC', 'ETH', 'USD']:
-            if currency in aum_by_currency['currency'].values:
-                currency_data = aum_by_currency[aum_by_currency['currency'] == currency]
-                fig_aum.add_trace(go.Scatter(
-                    x=currency_data['date'],
-                    y=currency_data['aum_usd'],
-                    name=currency,
-                    mode='lines',
-                    stackgroup='one',
-                    fillcolor=currency_colors.get(currency, '#95a5a6'),
-                    line=dict(width=0.5, color=currency_colors.get(currency, '#95a5a6')),
-                    hovertemplate='%{y:,.2f}<extra></extra>'
-                ))
-
-        fig_aum.update_layout(
-            xaxis_title="Date",
-            yaxis_title="AUM (USD)",
-            hovermode='x unified',
-            height=500,
-            yaxis=dict(tickformat=',.0f')
-        )
-        st.plotly_chart(fig_aum, use_container_width=True)
+        st.plotly_chart(aum_by_currency_figure(aum_by_currency), use_container_width=True)
 
         st.markdown("---")
 
         # AUM Stacked Area Chart by Machine
         st.subheader("Total AUM Over Time (USD) - By Machine")
-
-        # Create stacked area chart by machine
-        fig_aum_machine = go.Figure()
-
-        # Get unique machines and assign colors
-        unique_machines = all_projections['machine_name'].unique()
-        # Generate enough colors by cycling through multiple color sets if needed
-        all_colors = (px.colors.qualitative.Set3 +
-                     px.colors.qualitative.Pastel +
-                     px.colors.qualitative.Set2 +
-                     px.colors.qualitative.Set1)
-        machine_colors = all_colors[:len(unique_machines)]
-
-        for i, machine_name in enumerate(unique_machines):
-            machine_data = all_projections[all_projections['machine_name'] == machine_name]
-            fig_aum_machine.add_trace(go.Scatter(
-                x=machine_data['date'],
-                y=machine_data['aum_usd'],
-                name=machine_name,
-                mode='lines',
-                stackgroup='one',
-                fillcolor=machine_colors[i],
-                line=dict(width=0.5, color=machine_colors[i]),
-                hovertemplate='%{y:,.2f}<extra></extra>'
-            ))
-
-        fig_aum_machine.update_layout(
-            xaxis_title="Date",
-            yaxis_title="AUM (USD)",
-            hovermode='x unified',
-            height=500,
-            yaxis=dict(tickformat=',.0f')
-        )
-        st.plotly_chart(fig_aum_machine, use_container_width=True)
+        st.plotly_chart(aum_by_machine_figure(all_projections), use_container_width=True)
 
         st.markdown("---")
 
         # Fees Over Time (with split)
         st.subheader("Fees Over Time (Management vs Performance)")
-        fees_by_date = calculator.aggregate_fees_by_date(all_projections)
-
-        fig_fees = go.Figure()
-        fig_fees.add_trace(go.Bar(
-            x=fees_by_date['date'],
-            y=fees_by_date['management_fee_usd'],
-            name='Management Fees',
-            marker_color='#2ecc71',
-            hovertemplate='%{y:,.2f}<extra></extra>'
-        ))
-        fig_fees.add_trace(go.Bar(
-            x=fees_by_date['date'],
-            y=fees_by_date['performance_fee_usd'],
-            name='Performance Fees',
-            marker_color='#3498db',
-            hovertemplate='%{y:,.2f}<extra></extra>'
-        ))
-
-        fig_fees.update_layout(
-            barmode='stack',
-            xaxis_title="Date",
-            yaxis_title="Fees (USD)",
-            hovermode='x unified',
-            height=400,
-            yaxis=dict(tickformat=',.0f')
-        )
-        st.plotly_chart(fig_fees, use_container_width=True)
+        st.plotly_chart(fees_figure(fees_by_date), use_container_width=True)
 
         st.markdown("---")
 
         # Fee % to AUM
         st.subheader("Fee % to AUM (Annualized)")
-
-        fig_fee_pct = go.Figure()
-        fig_fee_pct.add_trace(go.Scatter(
-            x=fee_pct_data['date'],
-            y=fee_pct_data['fee_pct_annualized'],
-            name='Fee %',
-            mode='lines+markers',
-            line=dict(width=2, color='#e74c3c'),
-            hovertemplate='%{y:.2f}%<extra></extra>'
-        ))
-
-        fig_fee_pct.update_layout(
-            xaxis_title="Date",
-            yaxis_title="Fee % (Annualized)",
-            yaxis=dict(
-                range=[0, 1],
-                tickformat='.2f',
-                ticksuffix='%'
-            ),
-            hovermode='x unified',
-            height=400
-        )
-        st.plotly_chart(fig_fee_pct, use_container_width=True)
+        st.plotly_chart(fee_pct_figure(fee_pct_data), use_container_width=True)
 
 # TAB 2: Machines Management
-with tab2:
+# Machine rates stored as fractions and edited as percentages
+PERCENT_FIELDS = [
+    'monthly_growth_rate', 'yield_apr',
+    'management_fee_total', 'management_fee_makina_share',
+    'performance_fee_total', 'performance_fee_makina_share',
+    'net_return_margin',
+]
+
+def render_machines(machines_list, scenario_id):
     st.header("Machines Configuration")
 
-    # Display existing machines
+    # Display existing machines (reuses the machines loaded for projections)
     st.subheader("Current Machines")
 
-    session = db.get_session()
-    machines = session.query(Machine).filter_by(scenario_id=selected_scenario.id).all()
-
-    if not machines:
+    if not machines_list:
         st.info("No machines configured yet.")
     else:
-        for i, machine in enumerate(machines):
-            with st.expander(f"🔧 {machine.name} ({machine.currency})", expanded=False):
-                col1, col2 = st.columns(2)
-
-                with col1:
-                    new_name = st.text_input("Name", value=machine.name, key=f"name_{machine.id}")
-                    currency = st.selectbox("Currency", ["ETH", "USD", "BTC"],
-                                          index=["ETH", "USD", "BTC"].index(machine.currency),
-                                          key=f"curr_{machine.id}")
-                    launch_date_val = st.date_input("Launch Date (optional)",
-                                                   value=machine.launch_date,
-                                                   key=f"launch_{machine.id}")
-                    initial_aum = st.number_input("Initial AUM", value=float(machine.initial_aum),
-                                                 min_value=0.0, key=f"aum_{machine.id}")
-                    monthly_growth = st.number_input("Monthly Growth Rate (%)",
-                                                    value=float(machine.monthly_growth_rate * 100),
-                                                    min_value=0.0, max_value=100.0, step=1.0,
-                                                    format="%.1f",
-                                                    key=f"growth_{machine.id}")
-                    yield_apr = st.number_input("Yield APR (%)", value=float(machine.yield_apr * 100),
-                                               min_value=0.0, max_value=100.0, step=1.0,
-                                               format="%.1f",
-                                               key=f"yield_{machine.id}")
-
-                with col2:
-                    mgmt_fee_total = st.number_input("Management Fee Total (%)",
-                                                    value=float(machine.management_fee_total * 100),
-                                                    min_value=0.0, max_value=100.0, step=0.01,
-                                                    format="%.2f", key=f"mgmt_total_{machine.id}")
-                    mgmt_fee_share = st.number_input("Management Fee Makina Share (%)",
-                                                    value=float(machine.management_fee_makina_share * 100),
-                                                    min_value=0.0, max_value=100.0, step=1.0,
-                                                    format="%.1f",
-                                                    key=f"mgmt_share_{machine.id}")
-                    perf_fee_total = st.number_input("Performance Fee Total (%)",
-                                                    value=float(machine.performance_fee_total * 100),
-                                                    min_value=0.0, max_value=100.0, step=1.0,
-                                                    format="%.1f",
-                                                    key=f"perf_total_{machine.id}")
-                    perf_fee_share = st.number_input("Performance Fee Makina Share (%)",
-                                                    value=float(machine.performance_fee_makina_share * 100),
-                                                    min_value=0.0, max_value=100.0, step=1.0,
-                                                    format="%.1f",
-                                                    key=f"perf_share_{machine.id}")
-                    net_return = st.number_input("Net Return Margin (%)",
-                                                value=float(machine.net_return_margin * 100),
-                                                min_value=0.0, max_value=100.0, step=1.0,
-                                                format="%.1f",
-                                                key=f"net_return_{machine.id}")
-
-                col_btn1, col_btn2 = st.columns([1, 5])
-                with col_btn1:
-                    if st.button("💾 Save", key=f"save_{machine.id}"):
-                        machine.name = new_name
-                        machine.currency = currency
-                        machine.launch_date = launch_date_val if launch_date_val else None
-                        machine.initial_aum = initial_aum
-                        machine.monthly_growth_rate = monthly_growth / 100
-                        machine.yield_apr = yield_apr / 100
-                        machine.management_fee_total = mgmt_fee_total / 100
-                        machine.management_fee_makina_share = mgmt_fee_share / 100
-                        machine.performance_fee_total = perf_fee_total / 100
-                        machine.performance_fee_makina_share = perf_fee_share / 100
-                        machine.net_return_margin = net_return / 100
-                        session.commit()
-                        st.success(f"✅ {machine.name} updated!")
-                        st.rerun()
-
-                with col_btn2:
-                    if st.button("🗑️ Delete", key=f"delete_{machine.id}"):
-                        session.delete(machine)
-                        session.commit()
-                        st.success(f"❌ {machine.name} deleted!")
-                        st.rerun()
+        # One editable grid for all machines; rates are shown as percentages
+        machines_df = pd.DataFrame({
+            'name': [m.name for m in machines_list],
+            'currency': [m.currency for m in machines_list],
+            'launch_date': pd.to_datetime([m.launch_date for m in machines_list]),
+            # dtype=float turns NULLs left in the database into NaN (empty cells)
+            'initial_aum': np.array([m.initial_aum for m in machines_list], dtype=float),
+            **{field: np.array([getattr(m, field) for m in machines_list], dtype=float) * 100
+               for field in PERCENT_FIELDS},
+        }, index=pd.Index([m.id for m in machines_list], name='id'))
+
+        def percent_column(label, fmt="%.1f%%"):
+            return st.column_config.NumberColumn(label, min_value=0.0, max_value=100.0, format=fmt, required=True)
+
+        edited_df = st.data_editor(
+            machines_df,
+            column_config={
+                'name': st.column_config.TextColumn("Name", required=True),
+                'currency': st.column_config.SelectboxColumn("Currency", options=["ETH", "USD", "BTC"], required=True),
+                'launch_date': st.column_config.DateColumn("Launch Date (optional)"),
+                'initial_aum': st.column_config.NumberColumn("Initial AUM", min_value=0.0, format="%.2f", required=True),
+                'monthly_growth_rate': percent_column("Monthly Growth Rate (%)"),
+                'yield_apr': percent_column("Yield APR (%)"),
+                'management_fee_total': percent_column("Management Fee Total (%)", "%.2f%%"),
+                'management_fee_makina_share': percent_column("Management Fee Makina Share (%)"),
+                'performance_fee_total': percent_column("Performance Fee Total (%)"),
+                'performance_fee_makina_share': percent_column("Performance Fee Makina Share (%)"),
+                'net_return_margin': percent_column("Net Return Margin (%)"),
+            },
+            num_rows="delete",
+            hide_index=True,
+            use_container_width=True,
+            key="machines_editor"
+        )
 
-    session.close()
+        # Only rows that differ from what was loaded are written back
+        kept_df = machines_df.loc[edited_df.index]
+        changed = ~((edited_df == kept_df) | (edited_df.isna() & kept_df.isna())).all(axis=1)
+        deleted_ids = machines_df.index.difference(edited_df.index).tolist()
+
+        # Cleared cells come back as NaN: initial_aum is NOT NULL and the
+        # rates would be stored as NULL, so such rows are not saved
+        missing = changed & edited_df[['initial_aum', *PERCENT_FIELDS]].isna().any(axis=1)
+
+        if st.button("💾 Save Changes", disabled=not (changed.any() or deleted_ids)):
+            if missing.any():
+                st.error(f"⚠️ Fill in every numeric field before saving: {', '.join(edited_df.loc[missing, 'name'])}")
+            else:
+                changed_rows = [
+                    {
+                        'id': machine_id,
+                        'name': row['name'],
+                        'currency': row['currency'],
+                        'launch_date': row['launch_date'].date() if pd.notna(row['launch_date']) else None,
+                        'initial_aum': row['initial_aum'],
+                        **{field: row[field] / 100 for field in PERCENT_FIELDS},
+                    }
+                    for machine_id, row in edited_df[changed].iterrows()
+                ]
+
+                # One executemany UPDATE for the edits, one DELETE for removed rows
+                session = db.get_session()
+                if changed_rows:
+                    session.bulk_update_mappings(Machine, changed_rows)
+                if deleted_ids:
+                    session.query(Machine).filter(Machine.id.in_(deleted_ids)).delete(synchronize_session=False)
+                session.commit()
+                session.close()
+
+                # Edits are now in the database; drop them so they are not replayed
+                del st.session_state["machines_editor"]
+                st.success(f"✅ Updated {len(changed_rows)} and deleted {len(deleted_ids)} machine(s)!")
+                st.rerun()
 
     st.markdown("---")
 
@@ -485,7 +618,7 @@ with tab2:
     if st.button("➕ Add Machine"):
         session = db.get_session()
         new_machine = Machine(
-            scenario_id=selected_scenario.id,
+            scenario_id=scenario_id,
             name=new_machine_name,
             currency=new_currency,
             launch_date=new_launch_date if new_launch_date else None,
@@ -508,56 +641,54 @@ with tab2:
     st.markdown("---")
     st.subheader("📋 Clone Machine")
 
-    session = db.get_session()
-    machines = session.query(Machine).filter_by(scenario_id=selected_scenario.id).all()
-
-    if machines:
+    if machines_list:
         machine_to_clone = st.selectbox("Select machine to clone",
-                                       [m.name for m in machines],
+                                       [m.name for m in machines_list],
                                        key="clone_select")
         num_clones = st.number_input("Number of clones", min_value=1, max_value=20, value=1, key="num_clones")
 
         if st.button("📋 Clone"):
-            source_machine = next(m for m in machines if m.name == machine_to_clone)
-
-            for i in range(int(num_clones)):
-                clone = Machine(
-                    scenario_id=selected_scenario.id,
-                    name=f"{source_machine.name} (Clone {i+1})",
-                    currency=source_machine.currency,
-                    launch_date=source_machine.launch_date,
-                    initial_aum=source_machine.initial_aum,
-                    monthly_growth_rate=source_machine.monthly_growth_rate,
-                    yield_apr=source_machine.yield_apr,
-                    management_fee_total=source_machine.management_fee_total,
-                    management_fee_makina_share=source_machine.management_fee_makina_share,
-                    performance_fee_total=source_machine.performance_fee_total,
-                    performance_fee_makina_share=source_machine.performance_fee_makina_share,
-                    net_return_margin=source_machine.net_return_margin,
-                    employee_capital=source_machine.employee_capital
-                )
-                session.add(clone)
-
+            source_machine = next(m for m in machines_list if m.name == machine_to_clone)
+
+            clone_rows = [
+                {
+                    'scenario_id': scenario_id,
+                    'name': f"{source_machine.name} (Clone {i+1})",
+                    'currency': source_machine.currency,
+                    'launch_date': source_machine.launch_date,
+                    'initial_aum': source_machine.initial_aum,
+                    'monthly_growth_rate': source_machine.monthly_growth_rate,
+                    'yield_apr': source_machine.yield_apr,
+                    'management_fee_total': source_machine.management_fee_total,
+                    'management_fee_makina_share': source_machine.management_fee_makina_share,
+                    'performance_fee_total': source_machine.performance_fee_total,
+                    'performance_fee_makina_share': source_machine.performance_fee_makina_share,
+                    'net_return_margin': source_machine.net_return_margin,
+                    'employee_capital': source_machine.employee_capital,
+                }
+                for i in range(int(num_clones))
+            ]
+
+            # Single multi-row INSERT instead of one per clone
+            session = db.get_session()
+            session.bulk_insert_mappings(Machine, clone_rows)
             session.commit()
+            session.close()
             st.success(f"✅ Created {num_clones} clone(s) of '{machine_to_clone}'!")
             st.rerun()
 
-    session.close()
-
 # TAB 3: Yearly View
-with tab3:
+def render_yearly(all_projections, yearly_data):
     st.header("📈 Yearly Aggregation")
 
     if all_projections.empty:
         st.warning("No data available. Please configure machines first.")
     else:
-        yearly_data = calculator.aggregate_by_year(all_projections)
-
         # Display table
         st.subheader("Yearly Summary")
         yearly_display = yearly_data.copy()
 
-        # Format with M/B suffixes
+        # Format with M/B suffixes (one row per year, so a plain per-value map)
         def format_for_table(x):
             if x >= 1_000_000_000:
                 return f"${x/1_000_000_000:.2f}B"
@@ -566,11 +697,9 @@ with tab3:
             else:
                 return f"${x:,.2f}"
 
-        yearly_display['end_of_year_aum'] = yearly_display['end_of_year_aum'].apply(format_for_table)
-        yearly_display['total_management_fees'] = yearly_display['total_management_fees'].apply(format_for_table)
-        yearly_display['total_performance_fees'] = yearly_display['total_performance_fees'].apply(format_for_table)
-        yearly_display['total_fees'] = yearly_display['total_fees'].apply(format_for_table)
-        yearly_display['avg_fee_pct'] = yearly_display['avg_fee_pct'].apply(lambda x: f"{x:.2f}%")
+        for col in ['end_of_year_aum', 'total_management_fees', 'total_performance_fees', 'total_fees']:
+            yearly_display[col] = yearly_display[col].map(format_for_table)
+        yearly_display['avg_fee_pct'] = yearly_display['avg_fee_pct'].map(lambda x: f"{x:.2f}%")
 
         yearly_display.columns = ['Year', 'End of Year AUM', 'Management Fees', 'Performance Fees', 'Total Fees', 'Avg Fee %']
         st.dataframe(yearly_display, use_container_width=True, hide_index=True)
@@ -617,3 +746,16 @@ with tab3:
                 yaxis=dict(tickformat=',.0f')
             )
             st.plotly_chart(fig_yearly_fees, use_container_width=True)
+
+
+# Only the selected view is rendered; st.tabs would build all three on every rerun
+active_tab = st.radio("View", ["📊 Dashboard", "⚙️ Machines", "📈 Yearly View"],
+                      horizontal=True, label_visibility="collapsed", key="active_tab")
+
+if active_tab == "📊 Dashboard":
+    render_dashboard(all_projections, aum_by_currency, fees_by_date, fee_pct_data,
+                     total_aum, total_fees_monthly)
+elif active_tab == "⚙️ Machines":
+    render_machines(machines_list, scenario_id)
+else:
+    render_yearly(all_projections, yearly_data)
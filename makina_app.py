@@ -3,9 +3,18 @@
 import streamlit as st
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import pandas as pd
+import numpy as np
 import openpyxl
-from copy import deepcopy
+from src.excel_cache import load_cached
+from src.makina_model import (
+    ASSETS, ASSET_INPUTS, DAO_SPLIT_INPUTS, FEE_SPLIT_INPUTS,
+    calculate_all_years, calculate_revenue, to_arrays,
+)
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # python-calamine is optional; openpyxl is used instead
+    CalamineWorkbook = None
 
 # Utility functions
 def format_number(num):
@@ -51,16 +60,44 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# Data loading function
-@st.cache_data
-def load_excel_data(file_path):
-    """Load data from Excel file"""
-    wb = openpyxl.load_workbook(file_path, data_only=True)
+# Data loading functions
+def _parse_excel(file_path):
+    """Parse the model inputs from the Excel file"""
+    # Each sheet is pulled once as a 2D block of values (rows 1-18, columns A-K
+    # cover every input cell) and cells are then looked up by index
+    if CalamineWorkbook is not None:
+        # Rust reader: the input block comes back as one list of evaluated rows
+        wb = CalamineWorkbook.from_path(str(file_path))
+
+        def sheet_rows(sheet_name):
+            return wb.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False, nrows=18)
+    else:
+        # read_only streams the sheet XML instead of building the full workbook tree
+        wb = openpyxl.load_workbook(file_path, data_only=True, read_only=True)
+
+        def sheet_rows(sheet_name):
+            return list(wb[sheet_name].iter_rows(min_row=1, max_row=18, max_col=11, values_only=True))
+
+    def sheet_reader(sheet_name):
+        rows = sheet_rows(sheet_name)
+
+        def cell(row, col):
+            """1-based cell value, None outside the sheet's used range"""
+            try:
+                return rows[row - 1][col - 1]
+            except IndexError:
+                return None
+        return cell
+
+    # Pull every sheet up front so the file handle is released before parsing
+    try:
+        readers = {year: sheet_reader(f'MAK Revenue {year}') for year in [2025, 2026, 2027]}
+    finally:
+        wb.close()
 
     data = {}
     for year in [2025, 2026, 2027]:
-        sheet_name = f'MAK Revenue {year}'
-        sheet = wb[sheet_name]
+        cell = readers[year]
 
         # Extract inputs from modeling section
         # Row 9: TVL in native units (input)
@@ -69,129 +106,222 @@ def load_excel_data(file_path):
         year_data = {
             'year': year,
             'usdc': {
-                'tvl_units': sheet.cell(9, 3).value or 0,  # Native units
-                'price': sheet.cell(10, 3).value or 1.0,
-                'mgmt_fee': sheet.cell(12, 3).value or 0,
-                'perf_fee': sheet.cell(13, 3).value or 0,
-                'performance_growth': sheet.cell(14, 3).value or 0,
+                'tvl_units': cell(9, 3) or 0,  # Native units
+                'price': cell(10, 3) or 1.0,
+                'mgmt_fee': cell(12, 3) or 0,
+                'perf_fee': cell(13, 3) or 0,
+                'performance_growth': cell(14, 3) or 0,
             },
             'eth': {
-                'tvl_units': sheet.cell(9, 7).value or 0,  # Native units (ETH)
-                'price': sheet.cell(10, 7).value or 3000.0,
-                'mgmt_fee': sheet.cell(12, 7).value or 0,
-                'perf_fee': sheet.cell(13, 7).value or 0,
-                'performance_growth': sheet.cell(14, 7).value or 0,
+                'tvl_units': cell(9, 7) or 0,  # Native units (ETH)
+                'price': cell(10, 7) or 3000.0,
+                'mgmt_fee': cell(12, 7) or 0,
+                'perf_fee': cell(13, 7) or 0,
+                'performance_growth': cell(14, 7) or 0,
             },
             'btc': {
-                'tvl_units': sheet.cell(9, 11).value or 0,  # Native units (BTC)
-                'price': sheet.cell(10, 11).value or 90000.0,
-                'mgmt_fee': sheet.cell(12, 11).value or 0,
-                'perf_fee': sheet.cell(13, 11).value or 0,
-                'performance_growth': sheet.cell(14, 11).value or 0,
+                'tvl_units': cell(9, 11) or 0,  # Native units (BTC)
+                'price': cell(10, 11) or 90000.0,
+                'mgmt_fee': cell(12, 11) or 0,
+                'perf_fee': cell(13, 11) or 0,
+                'performance_growth': cell(14, 11) or 0,
             },
             'fee_split': {
-                'mgmt_dao': sheet.cell(17, 3).value or 0.6,
-                'mgmt_operator': sheet.cell(17, 4).value or 0.4,
-                'perf_dao': sheet.cell(18, 3).value or 0.6,
-                'perf_operator': sheet.cell(18, 4).value or 0.4,
+                'mgmt_dao': cell(17, 3) or 0.6,
+                'mgmt_operator': cell(17, 4) or 0.4,
+                'perf_dao': cell(18, 3) or 0.6,
+                'perf_operator': cell(18, 4) or 0.4,
             },
             'valuation': {
-                'price_rev_ratio': sheet.cell(4, 8).value or 45.0,
+                'price_rev_ratio': cell(4, 8) or 45.0,
             },
             'dao_split': {
-                'operations': sheet.cell(4, 11).value or 0.3,
-                'buyback': sheet.cell(5, 11).value or 0.4,
-                'revenue_share': sheet.cell(6, 11).value or 0.3,
+                'operations': cell(4, 11) or 0.3,
+                'buyback': cell(5, 11) or 0.4,
+                'revenue_share': cell(6, 11) or 0.3,
             }
         }
         data[year] = year_data
 
     return data
 
-# Calculation functions
-def calculate_revenue(data):
-    """Calculate revenue for each asset and total"""
-    results = {}
-
-    for asset in ['usdc', 'eth', 'btc']:
-        asset_data = data[asset]
-
-        # Calculate TVL in USD (native units × price)
-        tvl_usd = asset_data['tvl_units'] * asset_data['price']
-
-        # Management fee revenue (in native currency)
-        mgmt_revenue_native = asset_data['tvl_units'] * asset_data['mgmt_fee']
-        mgmt_revenue_usd = mgmt_revenue_native * asset_data['price']
-
-        # Performance fee revenue (in native currency)
-        perf_revenue_native = asset_data['tvl_units'] * asset_data['performance_growth'] * asset_data['perf_fee']
-        perf_revenue_usd = perf_revenue_native * asset_data['price']
-
-        # Total revenue
-        total_revenue_native = mgmt_revenue_native + perf_revenue_native
-        total_revenue_usd = mgmt_revenue_usd + perf_revenue_usd
-
-        results[asset] = {
-            'tvl_usd': tvl_usd,
-            'mgmt_revenue_native': mgmt_revenue_native,
-            'mgmt_revenue_usd': mgmt_revenue_usd,
-            'perf_revenue_native': perf_revenue_native,
-            'perf_revenue_usd': perf_revenue_usd,
-            'total_revenue_native': total_revenue_native,
-            'total_revenue_usd': total_revenue_usd,
-        }
+@st.cache_data
+def load_excel_data(file_path):
+    """Load data from Excel file"""
+    return load_cached(file_path, _parse_excel, 'makina_app')
+
+@st.cache_resource
+def baseline_inputs(file_path):
+    """
+    Workbook inputs as read-only arrays (see src.makina_model.to_arrays)
+
+    One frozen copy is shared by every session: new sessions start from a copy
+    of it and reset restores rows from it, so no per-session snapshot is kept.
+    """
+    arrays = to_arrays(load_excel_data(file_path))
+    for values in arrays.values():
+        values.flags.writeable = False
+    return arrays
+
+# Dashboard figures. Each is built once per session (see session_figure) and
+# later reruns only push new y values into its traces
+def session_figure(name, build, trace_ys):
+    """
+    This session's figure for a dashboard chart, built on first use
+
+    Later reruns keep the layout, template and trace styling and only swap
+    each trace's y values (trace_ys, in trace order) in one batch update.
+    """
+    figures = st.session_state.setdefault('figures', {})
+    fig = figures.get(name)
+    if fig is None:
+        fig = figures[name] = build()
+    else:
+        with fig.batch_update():
+            for trace, y in zip(fig.data, trace_ys):
+                trace.y = y
+    return fig
 
-    # Calculate splits by DAO/Operator
-    fee_split = data['fee_split']
-
-    # Total management revenue (in USD)
-    total_mgmt = sum(results[asset]['mgmt_revenue_usd'] for asset in ['usdc', 'eth', 'btc'])
-    mgmt_dao = total_mgmt * fee_split['mgmt_dao']
-    mgmt_operator = total_mgmt * fee_split['mgmt_operator']
-
-    # Total performance revenue (in USD)
-    total_perf = sum(results[asset]['perf_revenue_usd'] for asset in ['usdc', 'eth', 'btc'])
-    perf_dao = total_perf * fee_split['perf_dao']
-    perf_operator = total_perf * fee_split['perf_operator']
-
-    # Totals
-    total_tvl = sum(results[asset]['tvl_usd'] for asset in ['usdc', 'eth', 'btc'])
-    total_revenue = total_mgmt + total_perf
-    dao_revenue = mgmt_dao + perf_dao
-    operator_revenue = mgmt_operator + perf_operator
-
-    # Calculate take rates
-    dao_take_rate = (dao_revenue / total_tvl * 100) if total_tvl > 0 else 0
-    total_take_rate = (total_revenue / total_tvl * 100) if total_tvl > 0 else 0
-
-    # Valuation metrics
-    price_rev_ratio = data['valuation']['price_rev_ratio']
-    fdv = dao_revenue * price_rev_ratio
-    fdv_tvl_ratio = (fdv / total_tvl) if total_tvl > 0 else 0
-
-    results['summary'] = {
-        'total_tvl': total_tvl,
-        'total_revenue': total_revenue,
-        'dao_revenue': dao_revenue,
-        'operator_revenue': operator_revenue,
-        'mgmt_dao': mgmt_dao,
-        'mgmt_operator': mgmt_operator,
-        'perf_dao': perf_dao,
-        'perf_operator': perf_operator,
-        'dao_take_rate': dao_take_rate,
-        'total_take_rate': total_take_rate,
-        'price_rev_ratio': price_rev_ratio,
-        'fdv': fdv,
-        'fdv_tvl_ratio': fdv_tvl_ratio,
+def tvl_figure(tvl_matrix):
+    """Stacked TVL by asset; tvl_matrix is (years, assets) in ASSETS order"""
+    names = ['USDC', 'ETH', 'BTC']
+
+    # Define colors
+    colors = {
+        'USDC': '#2ecc71',  # Green
+        'ETH': '#3498db',   # Blue
+        'BTC': '#f39c12'    # Orange
     }
 
-    return results
+    fig_tvl = go.Figure()
 
-# Initialize session state with Excel data
-if 'data' not in st.session_state:
-    excel_file = 'Makina Revenue Generation Estimates.xlsx'
-    st.session_state.data = load_excel_data(excel_file)
-    st.session_state.original_data = deepcopy(st.session_state.data)
+    # BTC first so it sits at the bottom of the stack
+    for i in [2, 1, 0]:
+        fig_tvl.add_trace(go.Bar(
+            x=[2025, 2026, 2027],
+            y=tvl_matrix[:, i],
+            name=names[i],
+            marker_color=colors[names[i]],
+            hovertemplate='%{y:,.0f}<extra></extra>'
+        ))
+
+    fig_tvl.update_layout(
+        barmode='stack',
+        xaxis_title="Year",
+        yaxis_title="TVL (USD)",
+        height=400,
+        yaxis=dict(tickformat=',.0f'),
+        hovermode='x unified',
+        margin=dict(l=20, r=20, t=20, b=20)
+    )
+    return fig_tvl
+
+def dao_fees_figure(mgmt_fees, perf_fees):
+    """Stacked DAO management vs performance fees by year"""
+    fig_fees = go.Figure()
+
+    fig_fees.add_trace(go.Bar(
+        x=[2025, 2026, 2027],
+        y=mgmt_fees,
+        name='Management Fees',
+        marker_color='#2ecc71',
+        hovertemplate='%{y:,.0f}<extra></extra>'
+    ))
+
+    fig_fees.add_trace(go.Bar(
+        x=[2025, 2026, 2027],
+        y=perf_fees,
+        name='Performance Fees',
+        marker_color='#3498db',
+        hovertemplate='%{y:,.0f}<extra></extra>'
+    ))
+
+    fig_fees.update_layout(
+        barmode='stack',
+        xaxis_title="Year",
+        yaxis_title="DAO Fees (USD)",
+        height=400,
+        yaxis=dict(tickformat=',.0f'),
+        hovermode='x unified',
+        margin=dict(l=20, r=20, t=20, b=20)
+    )
+    return fig_fees
+
+def fdv_figure(fdv_values, fdv_tvl_values):
+    """FDV bars with the FDV/TVL ratio on a secondary axis"""
+    fig_fdv = make_subplots(specs=[[{"secondary_y": True}]])
+
+    # Add bar chart for FDV
+    fig_fdv.add_trace(
+        go.Bar(
+            x=[2025, 2026, 2027],
+            y=fdv_values,
+            name="FDV",
+            marker_color='#9b59b6',
+            hovertemplate='%{y:,.0f}<extra></extra>'
+        ),
+        secondary_y=False
+    )
+
+    # Add line chart for FDV/TVL ratio
+    fig_fdv.add_trace(
+        go.Scatter(
+            x=[2025, 2026, 2027],
+            y=fdv_tvl_values,
+            name="FDV/TVL Ratio",
+            mode='lines+markers',
+            line=dict(color='#e74c3c', width=3),
+            marker=dict(size=10),
+            hovertemplate='%{y:.2f}x<extra></extra>'
+        ),
+        secondary_y=True
+    )
+
+    fig_fdv.update_xaxes(title_text="Year")
+    fig_fdv.update_yaxes(title_text="FDV (USD)", secondary_y=False, tickformat=',.0f')
+    fig_fdv.update_yaxes(title_text="FDV/TVL Ratio", secondary_y=True)
+    fig_fdv.update_layout(
+        height=400,
+        hovermode='x unified',
+        margin=dict(l=20, r=20, t=20, b=20)
+    )
+    return fig_fdv
+
+def take_rate_figure(take_rates):
+    """DAO take rate by year"""
+    fig_take = go.Figure()
+
+    fig_take.add_trace(go.Scatter(
+        x=[2025, 2026, 2027],
+        y=take_rates,
+        mode='lines+markers',
+        line=dict(color='#e74c3c', width=3),
+        marker=dict(size=12),
+        hovertemplate='%{y:.2f}%<extra></extra>'
+    ))
+
+    fig_take.update_layout(
+        xaxis_title="Year",
+        yaxis_title="DAO Take Rate (%)",
+        height=400,
+        yaxis=dict(tickformat='.2f', ticksuffix='%'),
+        hovermode='x unified',
+        margin=dict(l=20, r=20, t=20, b=20)
+    )
+    return fig_take
+
+
+def sync_price_rev():
+    """Apply the dashboard P/Rev ratio to every year before the rerun renders."""
+    st.session_state.inputs['price_rev_ratio'][:] = st.session_state.price_rev_dashboard
+
+YEARS = [2025, 2026, 2027]
+
+# Initialize session state with Excel data, held as per-field arrays with one
+# row per year
+baseline = baseline_inputs('Makina Revenue Generation Estimates.xlsx')
+if 'inputs' not in st.session_state:
+    st.session_state.inputs = {field: values.copy() for field, values in baseline.items()}
 
 # Sidebar - title
 with st.sidebar:
@@ -207,10 +337,8 @@ with tab1:
     st.header("Revenue Model Dashboard")
     st.markdown("### End of 2027 Summary")
 
-    # Calculate results for all years
-    all_results = {}
-    for year in [2025, 2026, 2027]:
-        all_results[year] = calculate_revenue(st.session_state.data[year])
+    # Calculate results for all years in one batch
+    all_results = calculate_all_years(st.session_state.inputs, YEARS)
 
     # Get 2027 summary for top metrics
     summary_2027 = all_results[2027]['summary']
@@ -228,18 +356,14 @@ with tab1:
         st.metric("DAO Take Rate", format_percentage(summary_2027['dao_take_rate']))
     with col5:
         # Add P/Rev ratio control
-        price_rev = st.number_input(
+        st.number_input(
             "P/Rev Ratio",
             value=summary_2027['price_rev_ratio'],
             min_value=0.0,
             step=1.0,
-            key='price_rev_dashboard'
+            key='price_rev_dashboard',
+            on_change=sync_price_rev
         )
-        # Update all years if changed
-        if price_rev != summary_2027['price_rev_ratio']:
-            for year in [2025, 2026, 2027]:
-                st.session_state.data[year]['valuation']['price_rev_ratio'] = price_rev
-            st.rerun()
 
     # Second row with FDV metrics
     col1, col2, col3 = st.columns(3)
@@ -251,87 +375,29 @@ with tab1:
     st.markdown("---")
 
     # Prepare data for all charts
-    tvl_data = []
-    for year in [2025, 2026, 2027]:
-        results = all_results[year]
-        tvl_data.append({
-            'Year': year,
-            'USDC': results['usdc']['tvl_usd'],
-            'ETH': results['eth']['tvl_usd'],
-            'BTC': results['btc']['tvl_usd'],
-        })
-    tvl_df = pd.DataFrame(tvl_data)
-
-    # Define colors
-    colors = {
-        'USDC': '#2ecc71',  # Green
-        'ETH': '#3498db',   # Blue
-        'BTC': '#f39c12'    # Orange
-    }
+    tvl_matrix = np.array([[all_results[year][asset]['tvl_usd'] for asset in ASSETS]
+                           for year in [2025, 2026, 2027]])
 
-    mgmt_fees = [all_results[year]['summary']['mgmt_dao'] for year in [2025, 2026, 2027]]
-    perf_fees = [all_results[year]['summary']['perf_dao'] for year in [2025, 2026, 2027]]
-    fdv_values = [all_results[year]['summary']['fdv'] for year in [2025, 2026, 2027]]
-    fdv_tvl_values = [all_results[year]['summary']['fdv_tvl_ratio'] for year in [2025, 2026, 2027]]
-    take_rates = [all_results[year]['summary']['dao_take_rate'] for year in [2025, 2026, 2027]]
+    mgmt_fees = tuple(all_results[year]['summary']['mgmt_dao'] for year in [2025, 2026, 2027])
+    perf_fees = tuple(all_results[year]['summary']['perf_dao'] for year in [2025, 2026, 2027])
+    fdv_values = tuple(all_results[year]['summary']['fdv'] for year in [2025, 2026, 2027])
+    fdv_tvl_values = tuple(all_results[year]['summary']['fdv_tvl_ratio'] for year in [2025, 2026, 2027])
+    take_rates = tuple(all_results[year]['summary']['dao_take_rate'] for year in [2025, 2026, 2027])
 
     # First row of charts: TVL by Asset and DAO Fees
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("TVL by Asset (2025-2027)")
-        fig_tvl = go.Figure()
-
-        for asset in ['BTC', 'ETH', 'USDC']:
-            fig_tvl.add_trace(go.Bar(
-                x=tvl_df['Year'],
-                y=tvl_df[asset],
-                name=asset,
-                marker_color=colors[asset],
-                hovertemplate='%{y:,.0f}<extra></extra>'
-            ))
-
-        fig_tvl.update_layout(
-            barmode='stack',
-            xaxis_title="Year",
-            yaxis_title="TVL (USD)",
-            height=400,
-            yaxis=dict(tickformat=',.0f'),
-            hovermode='x unified',
-            margin=dict(l=20, r=20, t=20, b=20)
-        )
-        st.plotly_chart(fig_tvl, use_container_width=True)
+        tvl_ys = [tvl_matrix[:, i] for i in [2, 1, 0]]  # Trace order: BTC, ETH, USDC
+        st.plotly_chart(session_figure('tvl', lambda: tvl_figure(tvl_matrix), tvl_ys),
+                        use_container_width=True)
 
     with col2:
         st.subheader("DAO Fees by Type (2025-2027)")
-        fig_fees = go.Figure()
-
-        fig_fees.add_trace(go.Bar(
-            x=[2025, 2026, 2027],
-            y=mgmt_fees,
-            name='Management Fees',
-            marker_color='#2ecc71',
-            hovertemplate='%{y:,.0f}<extra></extra>'
-        ))
-
-        fig_fees.add_trace(go.Bar(
-            x=[2025, 2026, 2027],
-            y=perf_fees,
-            name='Performance Fees',
-            marker_color='#3498db',
-            hovertemplate='%{y:,.0f}<extra></extra>'
-        ))
-
-        fig_fees.update_layout(
-            barmode='stack',
-            xaxis_title="Year",
-            yaxis_title="DAO Fees (USD)",
-            height=400,
-            yaxis=dict(tickformat=',.0f'),
-            hovermode='x unified',
-            margin=dict(l=20, r=20, t=20, b=20)
-        )
-        st.plotly_chart(fig_fees, use_container_width=True)
+        st.plotly_chart(session_figure('dao_fees', lambda: dao_fees_figure(mgmt_fees, perf_fees),
+                                       [mgmt_fees, perf_fees]),
+                        use_container_width=True)
 
     st.markdown("---")
 
@@ -340,66 +406,14 @@ with tab1:
 
     with col1:
         st.subheader("FDV and FDV/TVL Ratio (2025-2027)")
-        fig_fdv = make_subplots(specs=[[{"secondary_y": True}]])
-
-        # Add bar chart for FDV
-        fig_fdv.add_trace(
-            go.Bar(
-                x=[2025, 2026, 2027],
-                y=fdv_values,
-                name="FDV",
-                marker_color='#9b59b6',
-                hovertemplate='%{y:,.0f}<extra></extra>'
-            ),
-            secondary_y=False
-        )
-
-        # Add line chart for FDV/TVL ratio
-        fig_fdv.add_trace(
-            go.Scatter(
-                x=[2025, 2026, 2027],
-                y=fdv_tvl_values,
-                name="FDV/TVL Ratio",
-                mode='lines+markers',
-                line=dict(color='#e74c3c', width=3),
-                marker=dict(size=10),
-                hovertemplate='%{y:.2f}x<extra></extra>'
-            ),
-            secondary_y=True
-        )
-
-        fig_fdv.update_xaxes(title_text="Year")
-        fig_fdv.update_yaxes(title_text="FDV (USD)", secondary_y=False, tickformat=',.0f')
-        fig_fdv.update_yaxes(title_text="FDV/TVL Ratio", secondary_y=True)
-        fig_fdv.update_layout(
-            height=400,
-            hovermode='x unified',
-            margin=dict(l=20, r=20, t=20, b=20)
-        )
-        st.plotly_chart(fig_fdv, use_container_width=True)
+        st.plotly_chart(session_figure('fdv', lambda: fdv_figure(fdv_values, fdv_tvl_values),
+                                       [fdv_values, fdv_tvl_values]),
+                        use_container_width=True)
 
     with col2:
         st.subheader("DAO Take Rate (2025-2027)")
-        fig_take = go.Figure()
-
-        fig_take.add_trace(go.Scatter(
-            x=[2025, 2026, 2027],
-            y=take_rates,
-            mode='lines+markers',
-            line=dict(color='#e74c3c', width=3),
-            marker=dict(size=12),
-            hovertemplate='%{y:.2f}%<extra></extra>'
-        ))
-
-        fig_take.update_layout(
-            xaxis_title="Year",
-            yaxis_title="DAO Take Rate (%)",
-            height=400,
-            yaxis=dict(tickformat='.2f', ticksuffix='%'),
-            hovermode='x unified',
-            margin=dict(l=20, r=20, t=20, b=20)
-        )
-        st.plotly_chart(fig_take, use_container_width=True)
+        st.plotly_chart(session_figure('take_rate', lambda: take_rate_figure(take_rates), [take_rates]),
+                        use_container_width=True)
 
 # TAB 2: Configuration
 with tab2:
@@ -408,102 +422,119 @@ with tab2:
     # Year selector
     selected_year = st.selectbox("Select Year", [2025, 2026, 2027], key='config_year')
 
-    year_data = st.session_state.data[selected_year]
-
-    # Collect all inputs first
-    st.markdown("### Asset Parameters")
-
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.markdown("**USDC**")
-        usdc_tvl = st.number_input("TVL Amount (USDC)", value=float(year_data['usdc']['tvl_units']),
-                                   min_value=0.0, step=1000000.0, format="%.0f", key=f'usdc_tvl_{selected_year}')
-        usdc_price = st.number_input("Price (USD)", value=year_data['usdc']['price'],
-                                     min_value=0.0, step=0.01, key=f'usdc_price_{selected_year}')
-        usdc_mgmt = st.number_input("Mgmt Fee (%)", value=year_data['usdc']['mgmt_fee']*100,
-                                    min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'usdc_mgmt_{selected_year}')
-        usdc_perf = st.number_input("Perf Fee (%)", value=year_data['usdc']['perf_fee']*100,
-                                    min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'usdc_perf_{selected_year}')
-        usdc_growth = st.number_input("Performance Growth (%)", value=year_data['usdc']['performance_growth']*100,
-                                      min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'usdc_growth_{selected_year}')
-
-    with col2:
-        st.markdown("**ETH**")
-        eth_tvl = st.number_input("TVL Amount (ETH)", value=float(year_data['eth']['tvl_units']),
-                                 min_value=0.0, step=1000.0, format="%.0f", key=f'eth_tvl_{selected_year}')
-        eth_price = st.number_input("Price (USD)", value=year_data['eth']['price'],
-                                    min_value=0.0, step=100.0, key=f'eth_price_{selected_year}')
-        eth_mgmt = st.number_input("Mgmt Fee (%)", value=year_data['eth']['mgmt_fee']*100,
-                                   min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'eth_mgmt_{selected_year}')
-        eth_perf = st.number_input("Perf Fee (%)", value=year_data['eth']['perf_fee']*100,
-                                   min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'eth_perf_{selected_year}')
-        eth_growth = st.number_input("Performance Growth (%)", value=year_data['eth']['performance_growth']*100,
-                                     min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'eth_growth_{selected_year}')
-
-    with col3:
-        st.markdown("**BTC**")
-        btc_tvl = st.number_input("TVL Amount (BTC)", value=float(year_data['btc']['tvl_units']),
-                                 min_value=0.0, step=10.0, format="%.0f", key=f'btc_tvl_{selected_year}')
-        btc_price = st.number_input("Price (USD)", value=year_data['btc']['price'],
-                                    min_value=0.0, step=1000.0, key=f'btc_price_{selected_year}')
-        btc_mgmt = st.number_input("Mgmt Fee (%)", value=year_data['btc']['mgmt_fee']*100,
-                                   min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'btc_mgmt_{selected_year}')
-        btc_perf = st.number_input("Perf Fee (%)", value=year_data['btc']['perf_fee']*100,
-                                   min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'btc_perf_{selected_year}')
-        btc_growth = st.number_input("Performance Growth (%)", value=year_data['btc']['performance_growth']*100,
-                                     min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'btc_growth_{selected_year}')
-
-    st.markdown("---")
-    st.markdown("### DAO-Related Parameters")
-
+    # The selected year's inputs as plain floats, indexed like ASSETS
+    inputs = st.session_state.inputs
+    y = YEARS.index(selected_year)
+    tvl_units, price, mgmt_fee, perf_fee, growth = (inputs[field][y].tolist() for field in ASSET_INPUTS)
+    fee_split = dict(zip(FEE_SPLIT_INPUTS, inputs['fee_split'][y].tolist()))
+    dao_split = dict(zip(DAO_SPLIT_INPUTS, inputs['dao_split'][y].tolist()))
+
+    # The inputs are batched in a form, so editing them does not rerun the app
+    # until Update Preview or Save Changes is pressed
+    with st.form(f'config_{selected_year}', border=False):
+        # Collect all inputs first
+        st.markdown("### Asset Parameters")
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.markdown("**USDC**")
+            usdc_tvl = st.number_input("TVL Amount (USDC)", value=tvl_units[0],
+                                       min_value=0.0, step=1000000.0, format="%.0f", key=f'usdc_tvl_{selected_year}')
+            usdc_price = st.number_input("Price (USD)", value=price[0],
+                                         min_value=0.0, step=0.01, key=f'usdc_price_{selected_year}')
+            usdc_mgmt = st.number_input("Mgmt Fee (%)", value=mgmt_fee[0]*100,
+                                        min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'usdc_mgmt_{selected_year}')
+            usdc_perf = st.number_input("Perf Fee (%)", value=perf_fee[0]*100,
+                                        min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'usdc_perf_{selected_year}')
+            usdc_growth = st.number_input("Performance Growth (%)", value=growth[0]*100,
+                                          min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'usdc_growth_{selected_year}')
+
+        with col2:
+            st.markdown("**ETH**")
+            eth_tvl = st.number_input("TVL Amount (ETH)", value=tvl_units[1],
+                                     min_value=0.0, step=1000.0, format="%.0f", key=f'eth_tvl_{selected_year}')
+            eth_price = st.number_input("Price (USD)", value=price[1],
+                                        min_value=0.0, step=100.0, key=f'eth_price_{selected_year}')
+            eth_mgmt = st.number_input("Mgmt Fee (%)", value=mgmt_fee[1]*100,
+                                       min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'eth_mgmt_{selected_year}')
+            eth_perf = st.number_input("Perf Fee (%)", value=perf_fee[1]*100,
+                                       min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'eth_perf_{selected_year}')
+            eth_growth = st.number_input("Performance Growth (%)", value=growth[1]*100,
+                                         min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'eth_growth_{selected_year}')
+
+        with col3:
+            st.markdown("**BTC**")
+            btc_tvl = st.number_input("TVL Amount (BTC)", value=tvl_units[2],
+                                     min_value=0.0, step=10.0, format="%.0f", key=f'btc_tvl_{selected_year}')
+            btc_price = st.number_input("Price (USD)", value=price[2],
+                                        min_value=0.0, step=1000.0, key=f'btc_price_{selected_year}')
+            btc_mgmt = st.number_input("Mgmt Fee (%)", value=mgmt_fee[2]*100,
+                                       min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'btc_mgmt_{selected_year}')
+            btc_perf = st.number_input("Perf Fee (%)", value=perf_fee[2]*100,
+                                       min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'btc_perf_{selected_year}')
+            btc_growth = st.number_input("Performance Growth (%)", value=growth[2]*100,
+                                         min_value=0.0, max_value=100.0, step=0.1, format="%.2f", key=f'btc_growth_{selected_year}')
+
+        st.markdown("---")
+        st.markdown("### DAO-Related Parameters")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("**Fee Split (DAO / Operator)**")
+            mgmt_dao_split = st.number_input("Management Fee - DAO Share (%)", value=fee_split['mgmt_dao']*100,
+                                             min_value=0.0, max_value=100.0, step=1.0, key=f'mgmt_dao_{selected_year}')
+
+            st.markdown("")
+            perf_dao_split = st.number_input("Performance Fee - DAO Share (%)", value=fee_split['perf_dao']*100,
+                                             min_value=0.0, max_value=100.0, step=1.0, key=f'perf_dao_{selected_year}')
+
+        with col2:
+            st.markdown("**DAO Revenue Allocation**")
+            dao_ops = st.number_input("DAO Operations (%)", value=dao_split['operations']*100,
+                                      min_value=0.0, max_value=100.0, step=1.0, key=f'dao_ops_{selected_year}')
+            dao_buyback = st.number_input("Buyback (%)", value=dao_split['buyback']*100,
+                                          min_value=0.0, max_value=100.0, step=1.0, key=f'dao_buyback_{selected_year}')
+
+        st.markdown("---")
+        st.markdown("### Valuation Parameters")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            price_rev_ratio = st.number_input("Price/Revenue Ratio", value=float(inputs['price_rev_ratio'][y]),
+                                             min_value=0.0, step=1.0, key=f'price_rev_{selected_year}')
+
+        # Now calculate live preview and show buttons at the top
+        st.markdown("---")
+        st.markdown("---")  # Extra separator
+
+        # Action buttons FIRST
+        col1, col2, col3 = st.columns([1, 1, 3])
+
+        with col1:
+            save_button = st.form_submit_button("💾 Save Changes", type="primary", key=f'save_{selected_year}')
+        with col2:
+            st.form_submit_button("🔍 Update Preview", key=f'preview_{selected_year}')
+
+    reset_button = st.button("🔄 Reset to Original", key=f'reset_{selected_year}')
+
+    # Derived from the submitted inputs, so like the preview below these only
+    # refresh on Update Preview or Save Changes, never mid-edit
+    mgmt_op_split = 100 - mgmt_dao_split
+    perf_op_split = 100 - perf_dao_split
+    dao_revshare = 100 - dao_ops - dao_buyback
+
+    st.caption("Derived splits, as of the last Update Preview or Save Changes")
     col1, col2 = st.columns(2)
-
     with col1:
-        st.markdown("**Fee Split (DAO / Operator)**")
-        mgmt_dao_split = st.number_input("Management Fee - DAO Share (%)", value=year_data['fee_split']['mgmt_dao']*100,
-                                         min_value=0.0, max_value=100.0, step=1.0, key=f'mgmt_dao_{selected_year}')
-        mgmt_op_split = 100 - mgmt_dao_split
         st.text(f"Management Fee - Operator: {mgmt_op_split:.1f}%")
-
-        st.markdown("")
-        perf_dao_split = st.number_input("Performance Fee - DAO Share (%)", value=year_data['fee_split']['perf_dao']*100,
-                                         min_value=0.0, max_value=100.0, step=1.0, key=f'perf_dao_{selected_year}')
-        perf_op_split = 100 - perf_dao_split
         st.text(f"Performance Fee - Operator: {perf_op_split:.1f}%")
-
     with col2:
-        st.markdown("**DAO Revenue Allocation**")
-        dao_ops = st.number_input("DAO Operations (%)", value=year_data['dao_split']['operations']*100,
-                                  min_value=0.0, max_value=100.0, step=1.0, key=f'dao_ops_{selected_year}')
-        dao_buyback = st.number_input("Buyback (%)", value=year_data['dao_split']['buyback']*100,
-                                      min_value=0.0, max_value=100.0, step=1.0, key=f'dao_buyback_{selected_year}')
-        dao_revshare = 100 - dao_ops - dao_buyback
         st.text(f"Revenue Share: {dao_revshare:.1f}%")
-
         if dao_revshare < 0:
             st.warning(f"⚠️ Operations + Buyback cannot exceed 100%")
 
-    st.markdown("---")
-    st.markdown("### Valuation Parameters")
-
-    col1, col2 = st.columns(2)
-    with col1:
-        price_rev_ratio = st.number_input("Price/Revenue Ratio", value=year_data['valuation']['price_rev_ratio'],
-                                         min_value=0.0, step=1.0, key=f'price_rev_{selected_year}')
-
-    # Now calculate live preview and show buttons at the top
-    st.markdown("---")
-    st.markdown("---")  # Extra separator
-
-    # Action buttons FIRST
-    col1, col2, col3 = st.columns([1, 1, 3])
-
-    with col1:
-        save_button = st.button("💾 Save Changes", type="primary", key=f'save_{selected_year}')
-    with col2:
-        reset_button = st.button("🔄 Reset to Original", key=f'reset_{selected_year}')
-
     st.markdown("---")
 
     # Calculate live preview based on current inputs
@@ -572,40 +603,19 @@ with tab2:
 
     # Handle button actions
     if save_button:
-        # Update session state with new values
-        st.session_state.data[selected_year]['usdc']['tvl_units'] = usdc_tvl
-        st.session_state.data[selected_year]['usdc']['price'] = usdc_price
-        st.session_state.data[selected_year]['usdc']['mgmt_fee'] = usdc_mgmt / 100
-        st.session_state.data[selected_year]['usdc']['perf_fee'] = usdc_perf / 100
-        st.session_state.data[selected_year]['usdc']['performance_growth'] = usdc_growth / 100
-
-        st.session_state.data[selected_year]['eth']['tvl_units'] = eth_tvl
-        st.session_state.data[selected_year]['eth']['price'] = eth_price
-        st.session_state.data[selected_year]['eth']['mgmt_fee'] = eth_mgmt / 100
-        st.session_state.data[selected_year]['eth']['perf_fee'] = eth_perf / 100
-        st.session_state.data[selected_year]['eth']['performance_growth'] = eth_growth / 100
-
-        st.session_state.data[selected_year]['btc']['tvl_units'] = btc_tvl
-        st.session_state.data[selected_year]['btc']['price'] = btc_price
-        st.session_state.data[selected_year]['btc']['mgmt_fee'] = btc_mgmt / 100
-        st.session_state.data[selected_year]['btc']['perf_fee'] = btc_perf / 100
-        st.session_state.data[selected_year]['btc']['performance_growth'] = btc_growth / 100
-
-        st.session_state.data[selected_year]['fee_split']['mgmt_dao'] = mgmt_dao_split / 100
-        st.session_state.data[selected_year]['fee_split']['mgmt_operator'] = (100 - mgmt_dao_split) / 100
-        st.session_state.data[selected_year]['fee_split']['perf_dao'] = perf_dao_split / 100
-        st.session_state.data[selected_year]['fee_split']['perf_operator'] = (100 - perf_dao_split) / 100
-
-        st.session_state.data[selected_year]['valuation']['price_rev_ratio'] = price_rev_ratio
-
-        st.session_state.data[selected_year]['dao_split']['operations'] = dao_ops / 100
-        st.session_state.data[selected_year]['dao_split']['buyback'] = dao_buyback / 100
-        st.session_state.data[selected_year]['dao_split']['revenue_share'] = (100 - dao_ops - dao_buyback) / 100
+        # Save exactly the inputs the live preview used, one row per field
+        saved = to_arrays({selected_year: temp_data})
+        for field, values in inputs.items():
+            values[y] = saved[field][0]
 
         st.success(f"✅ Changes saved for {selected_year}!")
+        # Let the dashboard P/Rev control re-read the saved 2027 value
+        st.session_state.pop('price_rev_dashboard', None)
         st.rerun()
 
     if reset_button:
-        st.session_state.data[selected_year] = deepcopy(st.session_state.original_data[selected_year])
+        for field, values in inputs.items():
+            values[y] = baseline[field][y]
         st.success(f"✅ Reset {selected_year} to original values!")
+        st.session_state.pop('price_rev_dashboard', None)
         st.rerun()
@@ -1,10 +1,18 @@
 """Makina Revenue Model - Simplified Dashboard"""
 
+import posixpath
+import zipfile
+from xml.etree import ElementTree
+
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
-import openpyxl
-from copy import deepcopy
+from src.asset_metrics import aggregate_metrics, calculate_asset_metrics
+from src.excel_cache import load_cached
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # python-calamine is optional; the ZIP/XML reader is used instead
+    CalamineWorkbook = None
 
 # Utility functions
 def format_number(num):
@@ -71,39 +79,117 @@ st.markdown("""
             color: #0068C9 !important;
         }
     </style>
-    <script>
-    // Format slider numbers with thousand separators
-    function formatSliderNumbers() {
-        const sliders = document.querySelectorAll('[data-testid="stSlider"]');
-        sliders.forEach(slider => {
-            const thumbValue = slider.querySelector('[data-testid="stThumbValue"]');
-            if (thumbValue && thumbValue.textContent) {
-                const num = parseFloat(thumbValue.textContent.replace(/,/g, ''));
-                if (!isNaN(num) && num >= 1000) {
-                    thumbValue.textContent = num.toLocaleString('en-US');
-                }
-            }
-        });
-    }
-
-    // Run on load and on slider changes
-    if (document.readyState === 'loading') {
-        document.addEventListener('DOMContentLoaded', formatSliderNumbers);
-    } else {
-        formatSliderNumbers();
-    }
-
-    // Watch for changes
-    const observer = new MutationObserver(formatSliderNumbers);
-    observer.observe(document.body, { childList: true, subtree: true });
-    </script>
     """, unsafe_allow_html=True)
 
-# Data loading function
-@st.cache_data
-def load_excel_data(file_path):
-    """Load data from Excel file with custom starting values"""
-    wb = openpyxl.load_workbook(file_path, data_only=True)
+# Data loading functions
+# Only a handful of cells near the top of two sheets are needed. python-calamine
+# reads just that block when installed; otherwise the workbook is read straight
+# from its ZIP/XML parts with a stream parse that stops after the input block
+
+# Input cells read from each year sheet, and the last row they span
+INPUT_CELLS = ['C9', 'C10', 'C13', 'G9', 'G10', 'G13', 'K9', 'K10', 'K13', 'C17', 'D17', 'C18', 'D18', 'H4']
+INPUT_LAST_ROW = 18
+
+# 0-based (row, column) of each input cell (all in columns A-K), for readers
+# that return rows of values
+_CELL_INDEX = {ref: (int(ref[1:]) - 1, ord(ref[0]) - ord('A')) for ref in INPUT_CELLS}
+
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_DOC_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+def _sheet_paths(zf):
+    """Map sheet names to their worksheet XML part names"""
+    rels = ElementTree.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    targets = {rel.get('Id'): rel.get('Target') for rel in rels.iter(f'{_PKG_REL_NS}Relationship')}
+
+    paths = {}
+    workbook = ElementTree.fromstring(zf.read('xl/workbook.xml'))
+    for sheet in workbook.iter(f'{_MAIN_NS}sheet'):
+        target = targets[sheet.get(f'{_DOC_REL_NS}id')]
+        # Relationship targets are relative to xl/ unless absolute
+        paths[sheet.get('name')] = target.lstrip('/') if target.startswith('/') else posixpath.join('xl', target)
+    return paths
+
+def _shared_strings(zf):
+    """Shared string table, indexed like the s-type cell values"""
+    try:
+        root = ElementTree.fromstring(zf.read('xl/sharedStrings.xml'))
+    except KeyError:
+        return []
+    return [
+        ''.join(t.text or '' for t in si.findall(f'{_MAIN_NS}t') + si.findall(f'{_MAIN_NS}r/{_MAIN_NS}t'))
+        for si in root.iter(f'{_MAIN_NS}si')
+    ]
+
+def _cell_value(cell, strings):
+    """Cached value of a <c> element, typed the way openpyxl's data_only reader does"""
+    kind = cell.get('t', 'n')
+    if kind == 'inlineStr':
+        return ''.join(t.text or '' for t in cell.iter(f'{_MAIN_NS}t'))
+
+    v = cell.find(f'{_MAIN_NS}v')
+    if v is None or v.text is None:
+        return None  # Empty cell, or a formula without a cached result
+    text = v.text
+    if kind == 'n':
+        return float(text) if any(ch in text for ch in '.eE') else int(text)
+    if kind == 's':
+        return strings[int(text)]
+    if kind == 'b':
+        return text == '1'
+    return text  # str (formula string result) and e (error code)
+
+def _read_cells(zf, part_name, refs, last_row, strings):
+    """Values of the cells in refs, streaming the sheet only up to last_row"""
+    wanted = set(refs)
+    values = dict.fromkeys(refs)
+    with zf.open(part_name) as f:
+        for _, elem in ElementTree.iterparse(f):
+            if elem.tag == f'{_MAIN_NS}c':
+                if elem.get('r') in wanted:
+                    values[elem.get('r')] = _cell_value(elem, strings)
+            elif elem.tag == f'{_MAIN_NS}row':
+                if int(elem.get('r')) >= last_row:
+                    break
+                elem.clear()
+    return values
+
+def _read_cells_calamine(file_path, sheet_names):
+    """Values of INPUT_CELLS for each sheet in sheet_names, read with python-calamine"""
+    # Rust reader: the input block comes back as one list of evaluated rows
+    wb = CalamineWorkbook.from_path(str(file_path))
+    try:
+        sheet_cells = {}
+        for key, name in sheet_names.items():
+            rows = wb.get_sheet_by_name(name).to_python(skip_empty_area=False, nrows=INPUT_LAST_ROW)
+            values = {}
+            for ref in INPUT_CELLS:
+                row, col = _CELL_INDEX[ref]
+                try:
+                    value = rows[row][col]
+                except IndexError:
+                    value = None
+                # calamine fills empty cells with '', openpyxl-style readers use None
+                values[ref] = None if value == '' else value
+            sheet_cells[key] = values
+    finally:
+        wb.close()
+    return sheet_cells
+
+def _parse_excel(file_path):
+    """Parse the dashboard inputs from the Excel file, with custom starting values"""
+    sheet_names = {year: f'MAK Revenue {year}' for year in [2026, 2027]}
+    if CalamineWorkbook is not None:
+        sheet_cells = _read_cells_calamine(file_path, sheet_names)
+    else:
+        with zipfile.ZipFile(file_path) as zf:
+            sheet_paths = _sheet_paths(zf)
+            strings = _shared_strings(zf)
+            sheet_cells = {
+                year: _read_cells(zf, sheet_paths[name], INPUT_CELLS, INPUT_LAST_ROW, strings)
+                for year, name in sheet_names.items()
+            }
 
     data = {}
 
@@ -145,40 +231,39 @@ def load_excel_data(file_path):
 
     # 2026 and 2027 - read from Excel but override management fees and APRs
     for year in [2026, 2027]:
-        sheet_name = f'MAK Revenue {year}'
-        sheet = wb[sheet_name]
+        cell = sheet_cells[year]
 
         year_data = {
             'year': year,
             'usdc': {
-                'tvl_units': sheet.cell(9, 3).value or 0,
-                'price': sheet.cell(10, 3).value or 1.0,
+                'tvl_units': cell['C9'] or 0,
+                'price': cell['C10'] or 1.0,
                 'mgmt_fee': 0.01,  # Override to 1%
-                'perf_fee': sheet.cell(13, 3).value or 0,
+                'perf_fee': cell['C13'] or 0,
                 'performance_growth': 0.10,  # Override to 10% APR
             },
             'eth': {
-                'tvl_units': sheet.cell(9, 7).value or 0,
-                'price': sheet.cell(10, 7).value or 3000.0,
+                'tvl_units': cell['G9'] or 0,
+                'price': cell['G10'] or 3000.0,
                 'mgmt_fee': 0.01,  # Override to 1%
-                'perf_fee': sheet.cell(13, 7).value or 0,
+                'perf_fee': cell['G13'] or 0,
                 'performance_growth': 0.06,  # Override to 6% APR
             },
             'btc': {
-                'tvl_units': sheet.cell(9, 11).value or 0,
-                'price': sheet.cell(10, 11).value or 90000.0,
+                'tvl_units': cell['K9'] or 0,
+                'price': cell['K10'] or 90000.0,
                 'mgmt_fee': 0.01,  # Override to 1%
-                'perf_fee': sheet.cell(13, 11).value or 0,
+                'perf_fee': cell['K13'] or 0,
                 'performance_growth': 0.03,  # Override to 3% APR
             },
             'fee_split': {
-                'mgmt_dao': sheet.cell(17, 3).value or 0.6,
-                'mgmt_operator': sheet.cell(17, 4).value or 0.4,
-                'perf_dao': sheet.cell(18, 3).value or 0.6,
-                'perf_operator': sheet.cell(18, 4).value or 0.4,
+                'mgmt_dao': cell['C17'] or 0.6,
+                'mgmt_operator': cell['D17'] or 0.4,
+                'perf_dao': cell['C18'] or 0.6,
+                'perf_operator': cell['D18'] or 0.4,
             },
             'valuation': {
-                'price_rev_ratio': sheet.cell(4, 8).value or 45.0,
+                'price_rev_ratio': cell['H4'] or 45.0,
             },
             'buyback_pct': 70.0,
         }
@@ -186,113 +271,82 @@ def load_excel_data(file_path):
 
     return data
 
-# Calculate metrics for single asset
-def calculate_asset_metrics(asset_data, fee_split):
-    """Calculate metrics for a single asset"""
-    # TVL in USD
-    tvl_usd = asset_data['tvl_units'] * asset_data['price']
-
-    # Total APR
-    total_apr = asset_data['performance_growth']
-
-    # APR breakdown
-    mgmt_fee_apr = asset_data['mgmt_fee']
-    perf_fee_apr = asset_data['performance_growth'] * asset_data['perf_fee']
-    lp_apr = total_apr - mgmt_fee_apr - perf_fee_apr
-
-    # Revenue calculations (annual)
-    mgmt_revenue = tvl_usd * mgmt_fee_apr
-    perf_revenue = tvl_usd * perf_fee_apr
-    total_revenue = mgmt_revenue + perf_revenue
-
-    # DAO split
-    dao_mgmt = mgmt_revenue * fee_split['mgmt_dao']
-    dao_perf = perf_revenue * fee_split['perf_dao']
-    dao_revenue = dao_mgmt + dao_perf
-
-    # Operator split
-    op_mgmt = mgmt_revenue * fee_split['mgmt_operator']
-    op_perf = perf_revenue * fee_split['perf_operator']
-    op_revenue = op_mgmt + op_perf
-
-    # DAO take rate
-    dao_take_rate = (dao_revenue / tvl_usd * 100) if tvl_usd > 0 else 0
-
-    # Operator take rate
-    op_take_rate = (op_revenue / tvl_usd * 100) if tvl_usd > 0 else 0
-
+@st.cache_resource
+def load_excel_data(file_path):
+    """
+    Load data from Excel file with custom starting values
+
+    Parsed once per process and shared by every session, so the result is
+    never mutated: sessions edit a copy of it (see copy_scenario).
+    """
+    return load_cached(file_path, _parse_excel, 'makina_app_v2')
+
+def copy_scenario(data):
+    """Editable copy of a scenario from load_excel_data"""
+    # Years hold scalars and one level of dicts of numbers, so copying those
+    # dicts is a full copy without deepcopy's recursion and memo bookkeeping
     return {
-        'tvl_usd': tvl_usd,
-        'total_apr': total_apr * 100,  # Convert to percentage
-        'mgmt_fee_apr': mgmt_fee_apr * 100,
-        'perf_fee_apr': perf_fee_apr * 100,
-        'lp_apr': lp_apr * 100,
-        'total_revenue': total_revenue,
-        'dao_revenue': dao_revenue,
-        'op_revenue': op_revenue,
-        'dao_take_rate': dao_take_rate,
-        'op_take_rate': op_take_rate,
+        year: {key: value.copy() if isinstance(value, dict) else value for key, value in year_data.items()}
+        for year, year_data in data.items()
     }
 
 # Create Sankey diagram for APR flow
 def create_flow_chart(metrics, asset_name, dao_perf_share=0.6, dao_mgmt_share=0.6):
     """Create a Sankey diagram showing APR flow"""
-
-    # Nodes
-    labels = [
+    return _flow_chart_figure(asset_name, metrics['lp_apr'], metrics['perf_fee_apr'],
+                              metrics['mgmt_fee_apr'], dao_perf_share, dao_mgmt_share)
+
+# Sankey pieces that are the same for every asset; plotly copies them into
+# each figure, so the dicts themselves are never modified
+_SANKEY_NODE = dict(
+    pad=15,
+    thickness=20,
+    line=dict(color="white", width=0),
+    label=[
         "Total APR",           # 0
         "To LPs",              # 1
         "Performance Fee",     # 2
         "Management Fee",      # 3
         "DAO",                 # 4
         "Operator"             # 5
-    ]
-
-    # Links (source, target, value)
-    total = metrics['total_apr']
-    lp_pct = metrics['lp_apr']
-    perf_pct = metrics['perf_fee_apr']
-    mgmt_pct = metrics['mgmt_fee_apr']
-
-    # From Total APR
-    sources = [0, 0, 0]
-    targets = [1, 2, 3]
-    values = [lp_pct, perf_pct, mgmt_pct]
-
-    # From Performance Fee to DAO/Operator (using actual split)
-    if perf_pct > 0:
-        sources.extend([2, 2])
-        targets.extend([4, 5])
-        values.extend([perf_pct * dao_perf_share, perf_pct * (1 - dao_perf_share)])
+    ],
+    color=['#95a5a6', '#2ecc71', '#3498db', '#9b59b6', '#e67e22', '#e74c3c']
+)
 
-    # From Management Fee to DAO/Operator (using actual split)
-    if mgmt_pct > 0:
-        sources.extend([3, 3])
-        targets.extend([4, 5])
-        values.extend([mgmt_pct * dao_mgmt_share, mgmt_pct * (1 - dao_mgmt_share)])
+# Fixed link layout (source -> target); only the values change per figure
+_SANKEY_SOURCES = [0, 0, 0, 2, 2, 3, 3]
+_SANKEY_TARGETS = [1, 2, 3, 4, 5, 4, 5]
+_SANKEY_TEXTFONT = dict(color='black', size=12, family='Arial, sans-serif')
+_SANKEY_LAYOUT = dict(
+    font=dict(size=12, family="Arial, sans-serif", color="black"),
+    height=300,
+    margin=dict(l=10, r=10, t=40, b=10),
+    paper_bgcolor='white',
+    plot_bgcolor='white'
+)
 
-    # Colors
-    node_colors = ['#95a5a6', '#2ecc71', '#3498db', '#9b59b6', '#e67e22', '#e74c3c']
+# One built figure per distinct set of flow values: the sliders move on fixed
+# grids, so returning to an earlier position reuses its figure as is
+@st.cache_resource(max_entries=64)
+def _flow_chart_figure(asset_name, lp_pct, perf_pct, mgmt_pct, dao_perf_share, dao_mgmt_share):
+    """Sankey diagram of one asset's APR split into LP, DAO and operator flows"""
+    # Links: Total APR to LPs and both fees, then each fee split to the
+    # DAO/Operator (using actual split); a zero fee keeps its links at 0
+    values = [
+        lp_pct, perf_pct, mgmt_pct,
+        perf_pct * dao_perf_share, perf_pct * (1 - dao_perf_share),
+        mgmt_pct * dao_mgmt_share, mgmt_pct * (1 - dao_mgmt_share),
+    ]
 
     fig = go.Figure(data=[go.Sankey(
-        node=dict(
-            pad=15,
-            thickness=20,
-            line=dict(color="white", width=0),
-            label=labels,
-            color=node_colors
-        ),
+        node=_SANKEY_NODE,
         link=dict(
-            source=sources,
-            target=targets,
+            source=_SANKEY_SOURCES,
+            target=_SANKEY_TARGETS,
             value=values,
             color='rgba(200, 200, 200, 0.4)'
         ),
-        textfont=dict(
-            color='black',
-            size=12,
-            family='Arial, sans-serif'
-        )
+        textfont=_SANKEY_TEXTFONT
     )])
 
     fig.update_layout(
@@ -300,186 +354,25 @@ def create_flow_chart(metrics, asset_name, dao_perf_share=0.6, dao_mgmt_share=0.
             text=f"{asset_name} APR Flow (%)",
             font=dict(size=14, family="Arial, sans-serif", color="black")
         ),
-        font=dict(size=12, family="Arial, sans-serif", color="black"),
-        height=300,
-        margin=dict(l=10, r=10, t=40, b=10),
-        paper_bgcolor='white',
-        plot_bgcolor='white'
+        **_SANKEY_LAYOUT
     )
 
     return fig
 
-# Initialize session state with Excel data
-if 'data' not in st.session_state:
-    excel_file = 'Makina Revenue Generation Estimates.xlsx'
-    st.session_state.data = load_excel_data(excel_file)
-
-# Initialize changes tracking
-if 'has_changes' not in st.session_state:
-    st.session_state.has_changes = False
-
-# Track if data has been modified from original (for Reset button)
-if 'data_modified' not in st.session_state:
-    st.session_state.data_modified = False
-
-# Main Dashboard
-st.title("💰 Makina Revenue Model")
-
-# Year selector and buttons at top
-if st.session_state.has_changes:
-    col_year, col_apply, col_reset = st.columns([2, 1, 1])
-else:
-    col_year, col_reset = st.columns([3, 1])
-
-with col_year:
-    selected_year = st.selectbox("Select Year", [2026, 2027], index=0, key='year_selector')
-
-if st.session_state.has_changes:
-    with col_apply:
-        st.markdown("<div style='margin-top: 1.7rem;'></div>", unsafe_allow_html=True)
-        if st.button("✓ Apply Changes", type="primary", use_container_width=True):
-            # Apply buyback_pct and price_rev
-            buyback_key = f'buyback_slider_{selected_year}'
-            price_rev_key = f'price_rev_slider_{selected_year}'
-
-            if buyback_key in st.session_state:
-                st.session_state.data[selected_year]['buyback_pct'] = st.session_state[buyback_key]
-            if price_rev_key in st.session_state:
-                st.session_state.data[selected_year]['valuation']['price_rev_ratio'] = st.session_state[price_rev_key]
-
-            # Apply all pending changes from slider values
-            for asset_key in ['usdc', 'eth', 'btc']:
-                # Get slider keys for this asset
-                apr_key = f'{asset_key}_apr_{selected_year}'
-                tvl_key = f'{asset_key}_tvl_{selected_year}'
-                price_key = f'{asset_key}_price_{selected_year}'
-                perf_fee_key = f'{asset_key}_perf_fee_{selected_year}'
-                mgmt_fee_key = f'{asset_key}_mgmt_fee_{selected_year}'
-                dao_perf_key = f'{asset_key}_dao_perf_{selected_year}'
-                dao_mgmt_key = f'{asset_key}_dao_mgmt_{selected_year}'
-
-                # Apply values if keys exist in session state
-                if apr_key in st.session_state:
-                    st.session_state.data[selected_year][asset_key]['performance_growth'] = st.session_state[apr_key] / 100
-                if tvl_key in st.session_state:
-                    st.session_state.data[selected_year][asset_key]['tvl_units'] = st.session_state[tvl_key]
-                if price_key in st.session_state:
-                    st.session_state.data[selected_year][asset_key]['price'] = st.session_state[price_key]
-                if perf_fee_key in st.session_state:
-                    st.session_state.data[selected_year][asset_key]['perf_fee'] = st.session_state[perf_fee_key] / 100
-                if mgmt_fee_key in st.session_state:
-                    st.session_state.data[selected_year][asset_key]['mgmt_fee'] = st.session_state[mgmt_fee_key] / 100
-                if dao_perf_key in st.session_state:
-                    st.session_state.data[selected_year]['fee_split']['perf_dao'] = st.session_state[dao_perf_key] / 100
-                    st.session_state.data[selected_year]['fee_split']['perf_operator'] = (100 - st.session_state[dao_perf_key]) / 100
-                if dao_mgmt_key in st.session_state:
-                    st.session_state.data[selected_year]['fee_split']['mgmt_dao'] = st.session_state[dao_mgmt_key] / 100
-                    st.session_state.data[selected_year]['fee_split']['mgmt_operator'] = (100 - st.session_state[dao_mgmt_key]) / 100
-
-            st.session_state.has_changes = False
-            st.session_state.data_modified = True  # Mark that data differs from original
-            st.success("✅ All changes applied!")
-            st.rerun()
-
-with col_reset:
-    st.markdown("<div style='margin-top: 1.7rem;'></div>", unsafe_allow_html=True)
-    if st.button("🔄 Reset to Original Scenario", use_container_width=True, disabled=not st.session_state.data_modified):
-        # Reload from Excel
-        excel_file = 'Makina Revenue Generation Estimates.xlsx'
-        st.session_state.data = load_excel_data(excel_file)
-        st.session_state.has_changes = False
-        st.session_state.data_modified = False  # Back to original
-        st.success("✅ Reset to original scenario!")
-        st.rerun()
-
-st.markdown("---")
-
-# Get data for selected year
-year_data = st.session_state.data[selected_year]
-
-# Store current slider values to detect changes later
-if 'slider_values' not in st.session_state:
-    st.session_state.slider_values = {}
-
-# Calculate aggregate metrics
-total_dao_revenue = 0
-total_tvl = 0
-for asset in ['usdc', 'eth', 'btc']:
-    metrics = calculate_asset_metrics(year_data[asset], year_data['fee_split'])
-    total_dao_revenue += metrics['dao_revenue']
-    total_tvl += metrics['tvl_usd']
-
-avg_dao_take_rate = (total_dao_revenue / total_tvl * 100) if total_tvl > 0 else 0
-
-# Top 4 sections side-by-side
-section1, section2, section3, section4 = st.columns(4)
-
-# Section 1: TVL (big number)
-with section1:
-    st.markdown("<h2 style='margin-bottom: 0.5rem;'>TVL</h2>", unsafe_allow_html=True)
-    # Extra large TVL metric taking space of two regular metrics
-    st.markdown(f"<h1 style='font-size: 3.5rem; margin-top: 0; margin-bottom: 0;'>{format_number(total_tvl)}</h1>", unsafe_allow_html=True)
-
-# Section 2: DAO Revenue & Take Rate
-with section2:
-    st.markdown("### DAO Revenue &<br>Take Rate", unsafe_allow_html=True)
-    st.metric("Avg. DAO Take Rate", f"{avg_dao_take_rate:.2f}%")
-    # Add spacing before second metric to align with sections 3 and 4
-    st.markdown("<div style='margin-top: 0.2rem;'></div>", unsafe_allow_html=True)
-    st.metric("Annualized DAO Revenue", format_number(total_dao_revenue))
-
-# Section 3: Projected Revenue for Buyback and Token Staking Rewards
-with section3:
-    st.markdown("### Buyback & Staking<br>Rewards", unsafe_allow_html=True)
-
-    # Slider for buyback percentage
-    buyback_pct = st.slider(
-        "% of Revenue",
-        min_value=40.0,
-        max_value=80.0,
-        value=year_data['buyback_pct'],
-        step=1.0,
-        format="%.0f%%",
-        key=f'buyback_slider_{selected_year}'
-    )
-
-    # Calculate buyback revenue
-    buyback_revenue = total_dao_revenue * (buyback_pct / 100)
-
-    st.metric("Revenue for Buyback & Staking", format_number(buyback_revenue))
-
-# Section 4: Projected FDV
-with section4:
-    st.markdown("### Projected FDV<br>&nbsp;", unsafe_allow_html=True)  # &nbsp; for empty second line
-
-    # P/Rev slider
-    price_rev = st.slider(
-        "P/Rev",
-        min_value=15.0,
-        max_value=45.0,
-        value=year_data['valuation']['price_rev_ratio'],
-        step=1.0,
-        format="%.0f",
-        key=f'price_rev_slider_{selected_year}'
-    )
-
-    # Calculate FDV
-    fdv = total_dao_revenue * price_rev
-
-    st.metric("FDV", format_number(fdv))
-
-st.markdown("---")
+# TVL slider (max, step) per asset, in native units
+TVL_SLIDER_RANGES = {
+    'usdc': (10_000_000_000, 100_000_000),  # 0 to 10B in 100M steps
+    'eth': (1_000_000, 10_000),  # 0 to 1M in 10K steps
+    'btc': (50_000, 500),  # 0 to 50K in 500 steps
+}
 
-# Check for unsaved changes
-has_unsaved_changes = False
+# Asset section (inputs, flow chart, outputs); a fragment, so moving one of its
+# sliders reruns only this section instead of the whole dashboard
+@st.fragment
+def render_asset(asset_key, asset_name, selected_year):
+    """Render one vault's inputs, APR flow chart and outputs"""
+    year_data = st.session_state.data[selected_year]
 
-# Check if buyback_pct or price_rev changed
-if (abs(buyback_pct - year_data['buyback_pct']) > 0.01 or
-    abs(price_rev - year_data['valuation']['price_rev_ratio']) > 0.01):
-    has_unsaved_changes = True
-
-# Asset sections (USDC, ETH, BTC)
-for asset_key, asset_name in [('usdc', 'USDC'), ('eth', 'ETH'), ('btc', 'BTC')]:
     st.subheader(f"{asset_name} Vault")
 
     asset_data = year_data[asset_key]
@@ -502,48 +395,20 @@ for asset_key, asset_name in [('usdc', 'USDC'), ('eth', 'ETH'), ('btc', 'BTC')]:
         )
 
         # TVL - Slider with asset-specific ranges
+        max_tvl, step_tvl = TVL_SLIDER_RANGES[asset_key]
+        tvl_input = st.slider(
+            f"TVL ({asset_name})",
+            min_value=0.0,
+            max_value=float(max_tvl),
+            value=min(float(asset_data['tvl_units']), float(max_tvl)),
+            step=float(step_tvl),
+            format="%.0f",
+            key=f'{asset_key}_tvl_{selected_year}'
+        )
         if asset_key == 'usdc':
-            # USDC: 0 to 10B
-            max_tvl = 10_000_000_000
-            step_tvl = 100_000_000  # 100M steps
-            tvl_input = st.slider(
-                f"TVL (USDC)",
-                min_value=0.0,
-                max_value=float(max_tvl),
-                value=min(float(asset_data['tvl_units']), float(max_tvl)),
-                step=float(step_tvl),
-                format="%.0f",
-                key=f'{asset_key}_tvl_{selected_year}'
-            )
             st.caption(f"Current: {format_number(tvl_input)}")
-        elif asset_key == 'eth':
-            # ETH: 0 to 1M
-            max_tvl = 1_000_000
-            step_tvl = 10_000  # 10K steps
-            tvl_input = st.slider(
-                f"TVL (ETH)",
-                min_value=0.0,
-                max_value=float(max_tvl),
-                value=min(float(asset_data['tvl_units']), float(max_tvl)),
-                step=float(step_tvl),
-                format="%.0f",
-                key=f'{asset_key}_tvl_{selected_year}'
-            )
-            st.caption(f"Current: {tvl_input:,.0f} ETH")
-        else:  # BTC
-            # BTC: 0 to 50K
-            max_tvl = 50_000
-            step_tvl = 500  # 500 steps
-            tvl_input = st.slider(
-                f"TVL (BTC)",
-                min_value=0.0,
-                max_value=float(max_tvl),
-                value=min(float(asset_data['tvl_units']), float(max_tvl)),
-                step=float(step_tvl),
-                format="%.0f",
-                key=f'{asset_key}_tvl_{selected_year}'
-            )
-            st.caption(f"Current: {tvl_input:,.0f} BTC")
+        else:
+            st.caption(f"Current: {tvl_input:,.0f} {asset_name}")
 
         # Price (only for ETH and BTC) - Keep as number input
         if asset_key != 'usdc':
@@ -604,30 +469,29 @@ for asset_key, asset_name in [('usdc', 'USDC'), ('eth', 'ETH'), ('btc', 'BTC')]:
             key=f'{asset_key}_dao_mgmt_{selected_year}'
         )
 
-        # Check if any value has changed from saved data
-        if (abs(apr_input / 100 - asset_data['performance_growth']) > 0.001 or
+        # Check if any value has changed from saved data; the first change
+        # reruns the whole app so the Apply button appears at the top. Once
+        # the flag is set nothing here can change it, so the compares are skipped
+        if not st.session_state.has_changes and (
+            abs(apr_input / 100 - asset_data['performance_growth']) > 0.001 or
             abs(tvl_input - asset_data['tvl_units']) > 0.01 or
             abs(price_input - asset_data['price']) > 0.01 or
             abs(perf_fee_input / 100 - asset_data['perf_fee']) > 0.001 or
             abs(mgmt_fee_input / 100 - asset_data['mgmt_fee']) > 0.0001 or
             abs(dao_perf_input / 100 - year_data['fee_split']['perf_dao']) > 0.01 or
             abs(dao_mgmt_input / 100 - year_data['fee_split']['mgmt_dao']) > 0.01):
-            has_unsaved_changes = True
+            st.session_state.has_changes = True
+            st.rerun(scope="app")
 
         # Update button
         if st.button(f"Update {asset_name}", key=f'update_{asset_key}_{selected_year}'):
-            st.session_state.data[selected_year][asset_key]['performance_growth'] = apr_input / 100
-            st.session_state.data[selected_year][asset_key]['tvl_units'] = tvl_input
-            st.session_state.data[selected_year][asset_key]['price'] = price_input
-            st.session_state.data[selected_year][asset_key]['perf_fee'] = perf_fee_input / 100
-            st.session_state.data[selected_year][asset_key]['mgmt_fee'] = mgmt_fee_input / 100
-            st.session_state.data[selected_year]['fee_split']['perf_dao'] = dao_perf_input / 100
-            st.session_state.data[selected_year]['fee_split']['mgmt_dao'] = dao_mgmt_input / 100
-            st.session_state.data[selected_year]['fee_split']['perf_operator'] = (100 - dao_perf_input) / 100
-            st.session_state.data[selected_year]['fee_split']['mgmt_operator'] = (100 - dao_mgmt_input) / 100
-            st.session_state.has_changes = False
+            apply_asset_changes(selected_year, asset_key)
+            # Only this asset was saved: unsaved header sliders keep Apply visible
+            st.session_state.has_changes = header_changes_pending(selected_year)
             st.session_state.data_modified = True  # Mark that data differs from original
-            st.rerun()
+            # Not an on_click callback: from inside the fragment that would
+            # rerun only this section and leave the header totals stale
+            st.rerun(scope="app")
 
     # Calculate current metrics using current input values
     current_data = {
@@ -715,9 +579,190 @@ for asset_key, asset_name in [('usdc', 'USDC'), ('eth', 'ETH'), ('btc', 'BTC')]:
 
     st.markdown("---")
 
-# Update has_changes flag based on detected unsaved changes
-if has_unsaved_changes:
-    st.session_state.has_changes = True
-elif not has_unsaved_changes and st.session_state.has_changes:
-    # Keep the flag if it was set (until Apply or Reset is clicked)
-    pass
+def apply_asset_changes(selected_year, asset_key):
+    """Copy one vault's pending widget values for the year into the saved data"""
+    year_data = st.session_state.data[selected_year]
+    asset_data = year_data[asset_key]
+    fee_split = year_data['fee_split']
+
+    # Get slider keys for this asset
+    apr_key = f'{asset_key}_apr_{selected_year}'
+    tvl_key = f'{asset_key}_tvl_{selected_year}'
+    price_key = f'{asset_key}_price_{selected_year}'
+    perf_fee_key = f'{asset_key}_perf_fee_{selected_year}'
+    mgmt_fee_key = f'{asset_key}_mgmt_fee_{selected_year}'
+    dao_perf_key = f'{asset_key}_dao_perf_{selected_year}'
+    dao_mgmt_key = f'{asset_key}_dao_mgmt_{selected_year}'
+
+    # Apply values if keys exist in session state
+    if apr_key in st.session_state:
+        asset_data['performance_growth'] = st.session_state[apr_key] / 100
+    if tvl_key in st.session_state:
+        asset_data['tvl_units'] = st.session_state[tvl_key]
+    if price_key in st.session_state:
+        asset_data['price'] = st.session_state[price_key]
+    if perf_fee_key in st.session_state:
+        asset_data['perf_fee'] = st.session_state[perf_fee_key] / 100
+    if mgmt_fee_key in st.session_state:
+        asset_data['mgmt_fee'] = st.session_state[mgmt_fee_key] / 100
+    if dao_perf_key in st.session_state:
+        fee_split['perf_dao'] = st.session_state[dao_perf_key] / 100
+        fee_split['perf_operator'] = (100 - st.session_state[dao_perf_key]) / 100
+    if dao_mgmt_key in st.session_state:
+        fee_split['mgmt_dao'] = st.session_state[dao_mgmt_key] / 100
+        fee_split['mgmt_operator'] = (100 - st.session_state[dao_mgmt_key]) / 100
+
+# Apply/header callbacks run before the script, so the rerun the click or
+# slider change already triggers renders the new state without st.rerun()
+def apply_changes(selected_year):
+    """Copy the pending widget values for the year into the saved data"""
+    # Apply buyback_pct and price_rev
+    buyback_key = f'buyback_slider_{selected_year}'
+    price_rev_key = f'price_rev_slider_{selected_year}'
+
+    year_data = st.session_state.data[selected_year]
+    if buyback_key in st.session_state:
+        year_data['buyback_pct'] = st.session_state[buyback_key]
+    if price_rev_key in st.session_state:
+        year_data['valuation']['price_rev_ratio'] = st.session_state[price_rev_key]
+
+    # Apply all pending changes from slider values
+    for asset_key in ['usdc', 'eth', 'btc']:
+        apply_asset_changes(selected_year, asset_key)
+
+    st.session_state.has_changes = False
+    st.session_state.data_modified = True  # Mark that data differs from original
+
+def header_changes_pending(selected_year):
+    """Whether the buyback/P/Rev sliders differ from the saved values"""
+    year_data = st.session_state.data[selected_year]
+    buyback = st.session_state.get(f'buyback_slider_{selected_year}', year_data['buyback_pct'])
+    price_rev = st.session_state.get(f'price_rev_slider_{selected_year}', year_data['valuation']['price_rev_ratio'])
+    return (abs(buyback - year_data['buyback_pct']) > 0.01 or
+            abs(price_rev - year_data['valuation']['price_rev_ratio']) > 0.01)
+
+def flag_header_changes(selected_year):
+    """Mark the buyback/P/Rev sliders as unsaved when they leave the saved values"""
+    if header_changes_pending(selected_year):
+        st.session_state.has_changes = True
+
+# Original scenario; new sessions and Reset take an in-memory copy of it
+ORIGINAL_DATA = load_excel_data('Makina Revenue Generation Estimates.xlsx')
+
+# Initialize session state with Excel data
+if 'data' not in st.session_state:
+    st.session_state.data = copy_scenario(ORIGINAL_DATA)
+
+# Initialize changes tracking
+if 'has_changes' not in st.session_state:
+    st.session_state.has_changes = False
+
+# Track if data has been modified from original (for Reset button)
+if 'data_modified' not in st.session_state:
+    st.session_state.data_modified = False
+
+# Main Dashboard
+st.title("💰 Makina Revenue Model")
+
+# Year selector and buttons at top
+if st.session_state.has_changes:
+    col_year, col_apply, col_reset = st.columns([2, 1, 1], vertical_alignment="bottom")
+else:
+    col_year, col_reset = st.columns([3, 1], vertical_alignment="bottom")
+
+with col_year:
+    selected_year = st.selectbox("Select Year", [2026, 2027], index=0, key='year_selector')
+
+if st.session_state.has_changes:
+    with col_apply:
+        st.button("✓ Apply Changes", type="primary", use_container_width=True,
+                  on_click=apply_changes, args=(selected_year,))
+
+with col_reset:
+    if st.button("🔄 Reset to Original Scenario", use_container_width=True, disabled=not st.session_state.data_modified):
+        st.session_state.data = copy_scenario(ORIGINAL_DATA)
+        st.session_state.has_changes = False
+        st.session_state.data_modified = False  # Back to original
+        st.success("✅ Reset to original scenario!")
+        st.rerun()
+
+st.markdown("---")
+
+# Get data for selected year
+year_data = st.session_state.data[selected_year]
+
+# Store current slider values to detect changes later
+if 'slider_values' not in st.session_state:
+    st.session_state.slider_values = {}
+
+# Calculate aggregate metrics
+total_tvl, total_dao_revenue = aggregate_metrics(year_data)
+
+avg_dao_take_rate = (total_dao_revenue / total_tvl * 100) if total_tvl > 0 else 0
+
+# Top 4 sections side-by-side
+section1, section2, section3, section4 = st.columns(4)
+
+# Section 1: TVL (big number)
+with section1:
+    st.markdown("<h2 style='margin-bottom: 0.5rem;'>TVL</h2>", unsafe_allow_html=True)
+    # Extra large TVL metric taking space of two regular metrics
+    st.markdown(f"<h1 style='font-size: 3.5rem; margin-top: 0; margin-bottom: 0;'>{format_number(total_tvl)}</h1>", unsafe_allow_html=True)
+
+# Section 2: DAO Revenue & Take Rate
+with section2:
+    st.markdown("### DAO Revenue &<br>Take Rate", unsafe_allow_html=True)
+    st.metric("Avg. DAO Take Rate", f"{avg_dao_take_rate:.2f}%")
+    # Add spacing before second metric to align with sections 3 and 4
+    st.markdown("<div style='margin-top: 0.2rem;'></div>", unsafe_allow_html=True)
+    st.metric("Annualized DAO Revenue", format_number(total_dao_revenue))
+
+# Section 3: Projected Revenue for Buyback and Token Staking Rewards
+with section3:
+    st.markdown("### Buyback & Staking<br>Rewards", unsafe_allow_html=True)
+
+    # Slider for buyback percentage
+    buyback_pct = st.slider(
+        "% of Revenue",
+        min_value=40.0,
+        max_value=80.0,
+        value=year_data['buyback_pct'],
+        step=1.0,
+        format="%.0f%%",
+        key=f'buyback_slider_{selected_year}',
+        on_change=flag_header_changes,
+        args=(selected_year,)
+    )
+
+    # Calculate buyback revenue
+    buyback_revenue = total_dao_revenue * (buyback_pct / 100)
+
+    st.metric("Revenue for Buyback & Staking", format_number(buyback_revenue))
+
+# Section 4: Projected FDV
+with section4:
+    st.markdown("### Projected FDV<br>&nbsp;", unsafe_allow_html=True)  # &nbsp; for empty second line
+
+    # P/Rev slider
+    price_rev = st.slider(
+        "P/Rev",
+        min_value=15.0,
+        max_value=45.0,
+        value=year_data['valuation']['price_rev_ratio'],
+        step=1.0,
+        format="%.0f",
+        key=f'price_rev_slider_{selected_year}',
+        on_change=flag_header_changes,
+        args=(selected_year,)
+    )
+
+    # Calculate FDV
+    fdv = total_dao_revenue * price_rev
+
+    st.metric("FDV", format_number(fdv))
+
+st.markdown("---")
+
+# Asset sections (USDC, ETH, BTC)
+for asset_key, asset_name in [('usdc', 'USDC'), ('eth', 'ETH'), ('btc', 'BTC')]:
+    render_asset(asset_key, asset_name, selected_year)
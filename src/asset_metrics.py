@@ -0,0 +1,79 @@
+"""Per-vault APR and revenue metrics for the simplified Makina dashboard"""
+
+import functools
+
+# Vault assets, in dashboard order
+ASSETS = ['usdc', 'eth', 'btc']
+
+
+def aggregate_metrics(year_data):
+    """Total USD TVL and annualized DAO revenue across the vaults"""
+    fee_split = year_data['fee_split']
+    total_tvl = 0
+    total_dao_revenue = 0
+    for asset in ASSETS:
+        metrics = calculate_asset_metrics(year_data[asset], fee_split)
+        total_tvl += metrics['tvl_usd']
+        total_dao_revenue += metrics['dao_revenue']
+    return total_tvl, total_dao_revenue
+
+
+def calculate_asset_metrics(asset_data, fee_split):
+    """Calculate metrics for a single asset"""
+    return _asset_metrics(
+        asset_data['tvl_units'], asset_data['price'], asset_data['mgmt_fee'],
+        asset_data['perf_fee'], asset_data['performance_growth'],
+        fee_split['mgmt_dao'], fee_split['mgmt_operator'],
+        fee_split['perf_dao'], fee_split['perf_operator'],
+    )
+
+
+# typed, because int inputs (the hardcoded 2025 TVLs) can give int results
+@functools.lru_cache(maxsize=256, typed=True)
+def _asset_metrics(tvl_units, price, mgmt_fee, perf_fee, performance_growth,
+                   mgmt_dao, mgmt_operator, perf_dao, perf_operator):
+    """Dict of one asset's USD TVL, APR breakdown (%), annual revenues and take rates (%)"""
+    # TVL in USD
+    tvl_usd = tvl_units * price
+
+    # Total APR
+    total_apr = performance_growth
+
+    # APR breakdown
+    mgmt_fee_apr = mgmt_fee
+    perf_fee_apr = performance_growth * perf_fee
+    lp_apr = total_apr - mgmt_fee_apr - perf_fee_apr
+
+    # Revenue calculations (annual)
+    mgmt_revenue = tvl_usd * mgmt_fee_apr
+    perf_revenue = tvl_usd * perf_fee_apr
+    total_revenue = mgmt_revenue + perf_revenue
+
+    # DAO split
+    dao_mgmt = mgmt_revenue * mgmt_dao
+    dao_perf = perf_revenue * perf_dao
+    dao_revenue = dao_mgmt + dao_perf
+
+    # Operator split
+    op_mgmt = mgmt_revenue * mgmt_operator
+    op_perf = perf_revenue * perf_operator
+    op_revenue = op_mgmt + op_perf
+
+    # DAO take rate
+    dao_take_rate = (dao_revenue / tvl_usd * 100) if tvl_usd > 0 else 0
+
+    # Operator take rate
+    op_take_rate = (op_revenue / tvl_usd * 100) if tvl_usd > 0 else 0
+
+    return {
+        'tvl_usd': tvl_usd,
+        'total_apr': total_apr * 100,  # Convert to percentage
+        'mgmt_fee_apr': mgmt_fee_apr * 100,
+        'perf_fee_apr': perf_fee_apr * 100,
+        'lp_apr': lp_apr * 100,
+        'total_revenue': total_revenue,
+        'dao_revenue': dao_revenue,
+        'op_revenue': op_revenue,
+        'dao_take_rate': dao_take_rate,
+        'op_take_rate': op_take_rate,
+    }
@@ -1,11 +1,78 @@
 """Revenue calculation engine for Makina"""
 
+import bisect
+import calendar
+
+import numpy as np
 import pandas as pd
 from datetime import datetime, date
-from dateutil.relativedelta import relativedelta
 from typing import List, Dict
 from src.database import Machine, Scenario
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernel then runs as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+# Numeric machine parameters, in struct-of-arrays form for the projection kernel
+MACHINE_COLUMNS = (
+    'initial_aum', 'monthly_growth_rate', 'yield_apr',
+    'management_fee_total', 'management_fee_makina_share',
+    'performance_fee_total', 'performance_fee_makina_share',
+    'net_return_margin', 'employee_capital'
+)
+
+
+def machine_columns(machines: List[Machine]) -> Dict[str, np.ndarray]:
+    """Convert machines to a dict of float64 arrays, one per MACHINE_COLUMNS field"""
+    n = len(machines)
+    return {
+        field: np.fromiter((getattr(m, field) or 0.0 for m in machines), dtype=np.float64, count=n)
+        for field in MACHINE_COLUMNS
+    }
+
+
+@njit(cache=True)
+def _project(initial_aum, growth, yield_apr, mgmt_rate, perf_rate, net_margin,
+             employee_capital, launch_idx, months):
+    """
+    Projection kernel over all machines (one row per machine, one column per month)
+
+    Returns (aum, management_fee, performance_fee) in native currency, each shaped (M, months).
+    Months before launch_idx stay zero; AUM grows by initial_aum * growth after each active month.
+    """
+    n = initial_aum.shape[0]
+    aum = np.zeros((n, months))
+    mgmt_fee = np.zeros((n, months))
+    perf_fee = np.zeros((n, months))
+
+    for k in range(n):
+        current_aum = initial_aum[k]
+        monthly_addition = initial_aum[k] * growth[k]
+        for i in range(launch_idx[k], months):
+            aum[k, i] = current_aum
+            # Management Fee = (AUM * annual_fee_rate) / 12
+            mgmt_fee[k, i] = current_aum * mgmt_rate[k] / 12
+            # Performance Fee = Performance_Fee_Rate * Monthly_Yield * Net_Return_Margin * (1 - Employee_Capital_%)
+            monthly_yield = current_aum * yield_apr[k] / 12
+            perf_fee[k, i] = perf_rate[k] * monthly_yield * net_margin[k] * (1 - employee_capital[k])
+            current_aum = current_aum + monthly_addition
+
+    return aum, mgmt_fee, perf_fee
+
+
+def _month_dates(start: date, months: int) -> List[date]:
+    """Dates one calendar month apart, clamping the day to each month's length"""
+    dates = []
+    for i in range(months):
+        year, month = divmod(start.month - 1 + i, 12)
+        year += start.year
+        month += 1
+        dates.append(date(year, month, min(start.day, calendar.monthrange(year, month)[1])))
+    return dates
+
 
 class RevenueCalculator:
     """Calculates AUM and fees over time for machines"""
@@ -20,7 +87,7 @@ class RevenueCalculator:
         """
         self.start_date = start_date or date(2026, 1, 1)
         self.months = months
-        self.dates = [self.start_date + relativedelta(months=i) for i in range(months)]
+        self.dates = _month_dates(self.start_date, months)
 
     def calculate_machine_projections(self, machine: Machine, scenario: Scenario) -> pd.DataFrame:
         """
@@ -36,82 +103,7 @@ class RevenueCalculator:
         - performance_fee_usd: Performance fee in USD
         - total_fee_usd: Total fees in USD
         """
-        results = []
-
-        # Get currency conversion rate
-        currency_rates = {
-            'ETH': scenario.eth_price,
-            'USD': 1.0,
-            'BTC': scenario.btc_price
-        }
-        rate = currency_rates.get(machine.currency, 1.0)
-
-        # Initialize AUM
-        current_aum = machine.initial_aum
-
-        for month_date in self.dates:
-            # Check if machine has launched
-            if machine.launch_date and month_date < machine.launch_date:
-                # Before launch - all zeros
-                results.append({
-                    'date': month_date,
-                    'aum': 0.0,
-                    'aum_usd': 0.0,
-                    'management_fee': 0.0,
-                    'management_fee_usd': 0.0,
-                    'performance_fee': 0.0,
-                    'performance_fee_usd': 0.0,
-                    'total_fee_usd': 0.0
-                })
-                continue
-
-            # If this is launch month, start with initial AUM
-            if machine.launch_date and month_date == machine.launch_date:
-                current_aum = machine.initial_aum
-
-            # Calculate management fee for this month
-            # Management Fee = (AUM * annual_fee_rate) / 12
-            management_fee_native = current_aum * machine.management_fee_makina / 12
-            management_fee_usd = management_fee_native * rate
-
-            # Calculate yield for the month
-            # Monthly Yield = AUM * (annual_yield / 12)
-            monthly_yield = current_aum * machine.yield_apr / 12
-
-            # Calculate performance fee
-            # Performance Fee = Performance_Fee_Rate * Monthly_Yield * Net_Return_Margin * (1 - Employee_Capital_%)
-            employee_capital_rate = machine.employee_capital if machine.employee_capital else 0.0
-            performance_fee_native = (
-                machine.performance_fee_makina *
-                monthly_yield *
-                machine.net_return_margin *
-                (1 - employee_capital_rate)
-            )
-            performance_fee_usd = performance_fee_native * rate
-
-            # Total fees
-            total_fee_usd = management_fee_usd + performance_fee_usd
-
-            # Store results
-            results.append({
-                'date': month_date,
-                'aum': current_aum,
-                'aum_usd': current_aum * rate,
-                'management_fee': management_fee_native,
-                'management_fee_usd': management_fee_usd,
-                'performance_fee': performance_fee_native,
-                'performance_fee_usd': performance_fee_usd,
-                'total_fee_usd': total_fee_usd
-            })
-
-            # Update AUM for next month (add monthly growth)
-            monthly_addition = machine.initial_aum * machine.monthly_growth_rate
-            current_aum = current_aum + monthly_addition
-
-        df = pd.DataFrame(results)
-        df['machine_name'] = machine.name
-        df['currency'] = machine.currency
-        return df
+        return self.calculate_all_machines([machine], scenario)
 
     def calculate_all_machines(self, machines: List[Machine], scenario: Scenario) -> pd.DataFrame:
         """
@@ -119,12 +111,27 @@ class RevenueCalculator:
 
         Returns DataFrame with all machine projections combined
         """
-        all_dfs = []
-        for machine in machines:
-            df = self.calculate_machine_projections(machine, scenario)
-            all_dfs.append(df)
+        return self.calculate_projections(
+            machine_columns(machines),
+            [m.name for m in machines],
+            [m.currency for m in machines],
+            [m.launch_date for m in machines],
+            scenario
+        )
+
+    def calculate_projections(self, columns: Dict[str, np.ndarray], names: List[str],
+                              currencies: List[str], launch_dates: List[date],
+                              scenario: Scenario) -> pd.DataFrame:
+        """
+        Calculate projections from columnar machine data
+
+        Args:
+            columns: Numeric machine parameters as returned by machine_columns()
+            names, currencies, launch_dates: Per-machine values, same order as columns
 
-        if not all_dfs:
+        Returns DataFrame with all machine projections combined
+        """
+        if not names:
             # Return empty dataframe with correct structure
             return pd.DataFrame(columns=[
                 'date', 'aum', 'aum_usd', 'management_fee', 'management_fee_usd',
@@ -132,7 +139,49 @@ class RevenueCalculator:
                 'machine_name', 'currency'
             ])
 
-        return pd.concat(all_dfs, ignore_index=True)
+        n = len(names)
+
+        # Get currency conversion rate per machine
+        currency_rates = {
+            'ETH': scenario.eth_price,
+            'USD': 1.0,
+            'BTC': scenario.btc_price
+        }
+        rate = np.fromiter((currency_rates.get(c, 1.0) for c in currencies), dtype=np.float64, count=n)
+
+        # First projected month on or after each machine's launch date
+        # (self.dates is sorted, so a binary search replaces the linear scan)
+        launch_idx = np.fromiter(
+            (bisect.bisect_left(self.dates, launch) if launch else 0 for launch in launch_dates),
+            dtype=np.int64, count=n
+        )
+
+        # Makina's share of each fee
+        mgmt_rate = columns['management_fee_total'] * columns['management_fee_makina_share']
+        perf_rate = columns['performance_fee_total'] * columns['performance_fee_makina_share']
+
+        aum, management_fee, performance_fee = _project(
+            columns['initial_aum'], columns['monthly_growth_rate'], columns['yield_apr'],
+            mgmt_rate, perf_rate, columns['net_return_margin'], columns['employee_capital'],
+            launch_idx, self.months
+        )
+
+        rate = rate[:, None]
+        management_fee_usd = management_fee * rate
+        performance_fee_usd = performance_fee * rate
+
+        return pd.DataFrame({
+            'date': self.dates * n,
+            'aum': aum.ravel(),
+            'aum_usd': (aum * rate).ravel(),
+            'management_fee': management_fee.ravel(),
+            'management_fee_usd': management_fee_usd.ravel(),
+            'performance_fee': performance_fee.ravel(),
+            'performance_fee_usd': performance_fee_usd.ravel(),
+            'total_fee_usd': (management_fee_usd + performance_fee_usd).ravel(),
+            'machine_name': np.repeat(list(names), self.months),
+            'currency': np.repeat(list(currencies), self.months)
+        })
 
     def aggregate_by_currency(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -187,65 +236,53 @@ class RevenueCalculator:
             ])
 
         # First aggregate by date to get daily totals
-        daily_totals = df.groupby('date').agg({
-            'aum_usd': 'sum',
-            'management_fee_usd': 'sum',
-            'performance_fee_usd': 'sum',
-            'total_fee_usd': 'sum'
-        }).reset_index()
-
-        # Add year and month columns
-        daily_totals['year'] = pd.to_datetime(daily_totals['date']).dt.year
-        daily_totals['month'] = pd.to_datetime(daily_totals['date']).dt.month
-
-        # Get end of year AUM (last month of each year)
-        end_of_year = daily_totals.groupby('year').apply(
-            lambda x: x.loc[x['date'].idxmax(), 'aum_usd']
+        daily_totals = self.aggregate_fees_by_date(df)
+
+        # Year straight from the date objects; no datetime64 column is needed
+        years = np.fromiter((d.year for d in daily_totals['date']), dtype=np.int32, count=len(daily_totals))
+        daily_totals = daily_totals.assign(year=years)
+
+        # One grouped pass: daily_totals comes out of a date groupby, so it is
+        # in date order and each year's last row is its end-of-year AUM
+        yearly = daily_totals.groupby('year').agg(
+            end_of_year_aum=('aum_usd', 'last'),
+            total_management_fees=('management_fee_usd', 'sum'),
+            total_performance_fees=('performance_fee_usd', 'sum'),
+            total_fees=('total_fee_usd', 'sum'),
+            avg_aum_usd=('aum_usd', 'mean')
         ).reset_index()
-        end_of_year.columns = ['year', 'end_of_year_aum']
-
-        # Calculate average AUM for fee % calculation
-        avg_aum = daily_totals.groupby('year').agg({
-            'aum_usd': 'mean'
-        }).reset_index()
-        avg_aum.columns = ['year', 'avg_aum_usd']
-
-        # Sum fees by year
-        yearly_fees = daily_totals.groupby('year').agg({
-            'management_fee_usd': 'sum',
-            'performance_fee_usd': 'sum',
-            'total_fee_usd': 'sum'
-        }).reset_index()
-
-        # Merge all together
-        yearly = end_of_year.merge(yearly_fees, on='year')
-        yearly = yearly.merge(avg_aum, on='year')
 
         # Calculate average fee percentage
-        yearly['avg_fee_pct'] = (yearly['total_fee_usd'] / yearly['avg_aum_usd'] * 100).fillna(0)
+        yearly['avg_fee_pct'] = (yearly['total_fees'] / yearly['avg_aum_usd'] * 100).fillna(0)
 
         # Drop avg_aum_usd (we don't need it in final output)
         yearly = yearly.drop('avg_aum_usd', axis=1)
 
-        yearly.columns = [
-            'year', 'end_of_year_aum', 'total_management_fees',
-            'total_performance_fees', 'total_fees', 'avg_fee_pct'
-        ]
-
         return yearly
 
-    def calculate_fee_percentage(self, df: pd.DataFrame) -> pd.DataFrame:
+    def calculate_fee_percentage(self, df: pd.DataFrame, agg: pd.DataFrame = None) -> pd.DataFrame:
         """
         Calculate fee as percentage of AUM (annualized)
 
+        Args:
+            df: Projections, as returned by calculate_all_machines()
+            agg: Per-date totals of df from aggregate_fees_by_date(), when the
+                caller already has them; computed from df otherwise
+
         Returns DataFrame with columns: date, fee_pct_annualized
         """
         if df.empty:
             return pd.DataFrame(columns=['date', 'fee_pct_annualized'])
 
-        agg = self.aggregate_fees_by_date(df)
+        if agg is None:
+            agg = self.aggregate_fees_by_date(df)
 
-        # Annualized fee % = (monthly_fee / monthly_aum) * 12 * 100
-        agg['fee_pct_annualized'] = (agg['total_fee_usd'] / agg['aum_usd'] * 12 * 100).fillna(0)
+        # Annualized fee % = (monthly_fee / monthly_aum) * 12 * 100, 0 without AUM
+        total = agg['total_fee_usd'].to_numpy()
+        aum = agg['aum_usd'].to_numpy()
+        ratio = np.divide(total, aum, out=np.zeros_like(total), where=aum != 0)
 
-        return agg[['date', 'fee_pct_annualized', 'total_fee_usd', 'aum_usd']]
+        return pd.DataFrame({
+            'date': agg['date'].to_numpy(),
+            'fee_pct_annualized': ratio * 12 * 100
+        })
@@ -1,6 +1,6 @@
 """Database models and operations for Makina Revenue Model"""
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, ForeignKey, Boolean
+from sqlalchemy import create_engine, event, select, Column, Integer, String, Float, Date, ForeignKey, Boolean
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime, date
@@ -27,7 +27,7 @@ class Machine(Base):
     __tablename__ = 'machines'
 
     id = Column(Integer, primary_key=True)
-    scenario_id = Column(Integer, ForeignKey('scenarios.id'), nullable=False)
+    scenario_id = Column(Integer, ForeignKey('scenarios.id'), nullable=False, index=True)
     name = Column(String, nullable=False)
     currency = Column(String, nullable=False)  # ETH, USD, or BTC
     launch_date = Column(Date, nullable=True)
@@ -62,6 +62,30 @@ class Machine(Base):
         return self.performance_fee_total * self.performance_fee_makina_share
 
 
+# Machine columns captured by save_machines_snapshot (everything but the keys)
+SNAPSHOT_FIELDS = (
+    'name', 'currency', 'launch_date', 'initial_aum', 'monthly_growth_rate',
+    'management_fee_total', 'management_fee_makina_share',
+    'performance_fee_total', 'performance_fee_makina_share',
+    'yield_apr', 'net_return_margin'
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune each new SQLite connection (engine connect listener)
+
+    WAL with synchronous=NORMAL syncs on checkpoints instead of on every commit;
+    a crash can lose the last commits but never corrupts the database.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-20000")  # ~20 MB page cache
+    cursor.close()
+
+
 class DatabaseManager:
     """Handles database operations"""
 
@@ -69,7 +93,11 @@ class DatabaseManager:
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self.engine = create_engine(f'sqlite:///{db_path}')
+        event.listen(self.engine, 'connect', _set_sqlite_pragmas)
         Base.metadata.create_all(self.engine)
+        # create_all skips indexes on tables that already exist (older databases)
+        for index in Machine.__table__.indexes:
+            index.create(self.engine, checkfirst=True)
         self.Session = sessionmaker(bind=self.engine)
 
     def get_session(self):
@@ -81,8 +109,8 @@ class DatabaseManager:
         session = self.get_session()
 
         try:
-            # Check if data already exists
-            if session.query(Scenario).count() > 0:
+            # Check if data already exists (EXISTS stops at the first row)
+            if session.query(session.query(Scenario).exists()).scalar():
                 return
 
             # Create Base Case scenario
@@ -206,22 +234,10 @@ class DatabaseManager:
         """Save current machines as a snapshot for reset functionality"""
         session = self.get_session()
         try:
-            machines = session.query(Machine).filter_by(scenario_id=scenario_id).all()
-            snapshot = []
-            for m in machines:
-                snapshot.append({
-                    'name': m.name,
-                    'currency': m.currency,
-                    'launch_date': m.launch_date,
-                    'initial_aum': m.initial_aum,
-                    'monthly_growth_rate': m.monthly_growth_rate,
-                    'management_fee_total': m.management_fee_total,
-                    'management_fee_makina_share': m.management_fee_makina_share,
-                    'performance_fee_total': m.performance_fee_total,
-                    'performance_fee_makina_share': m.performance_fee_makina_share,
-                    'yield_apr': m.yield_apr,
-                    'net_return_margin': m.net_return_margin,
-                })
+            # Plain column tuples through Core: no ORM instances to hydrate
+            columns = [getattr(Machine, field) for field in SNAPSHOT_FIELDS]
+            rows = session.execute(select(*columns).where(Machine.scenario_id == scenario_id)).all()
+            snapshot = [dict(zip(SNAPSHOT_FIELDS, row)) for row in rows]
             return snapshot
         finally:
             session.close()
@@ -233,10 +249,11 @@ class DatabaseManager:
             # Delete all current machines
             session.query(Machine).filter_by(scenario_id=scenario_id).delete()
 
-            # Recreate machines from snapshot
-            for machine_data in snapshot:
-                machine = Machine(scenario_id=scenario_id, **machine_data)
-                session.add(machine)
+            # Recreate machines from snapshot: one executemany INSERT, in the
+            # same transaction as the delete
+            session.bulk_insert_mappings(
+                Machine, [{'scenario_id': scenario_id, **machine_data} for machine_data in snapshot]
+            )
 
             session.commit()
         except Exception as e:
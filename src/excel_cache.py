@@ -0,0 +1,58 @@
+"""On-disk cache of parsed Excel workbooks, shared by the dashboards"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+
+def load_cached(file_path, parse, tag):
+    """
+    Parse the Excel file with parse(path), reusing a pickled result from .cache/
+
+    The sidecar lives in .cache/ next to the workbook and survives process
+    restarts. Its key hashes the workbook's bytes together with the source file
+    that defines parse, so editing the workbook or the parser (including its
+    hardcoded overrides) both reparse. tag keeps each dashboard's sidecar for
+    the same workbook apart.
+
+    Sidecars are unpickled without any check and unpickling can run arbitrary
+    code, so the .cache/ directory must only be writable by trusted users.
+    """
+    path = Path(file_path)
+    key = hashlib.blake2b(digest_size=16)
+    key.update(path.read_bytes())
+    try:
+        key.update(Path(parse.__code__.co_filename).read_bytes())
+    except OSError:  # Source not on disk: fall back to the parser's bytecode
+        key.update(parse.__code__.co_code)
+    cache_file = path.parent / '.cache' / f'{key.hexdigest()}-{tag}.pkl'
+
+    try:
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    data = parse(path)
+
+    # Write to a temp file and rename so readers never see a partial pickle
+    tmp_path = None
+    try:
+        cache_file.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_file)
+        tmp_path = None
+    except OSError:
+        pass  # Read-only location: still serve the parsed data
+    finally:
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    return data
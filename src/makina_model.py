@@ -0,0 +1,183 @@
+"""Revenue calculation for the Makina revenue model dashboard"""
+
+import functools
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernel then runs as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+# Assets in calculation order, and the result keys produced per asset / per year
+ASSETS = ['usdc', 'eth', 'btc']
+RESULT_FIELDS = [
+    'tvl_usd', 'mgmt_revenue_native', 'mgmt_revenue_usd',
+    'perf_revenue_native', 'perf_revenue_usd',
+    'total_revenue_native', 'total_revenue_usd',
+]
+SUMMARY_FIELDS = [
+    'total_tvl', 'total_revenue', 'dao_revenue', 'operator_revenue',
+    'mgmt_dao', 'mgmt_operator', 'perf_dao', 'perf_operator',
+    'dao_take_rate', 'total_take_rate', 'price_rev_ratio', 'fdv', 'fdv_tvl_ratio',
+]
+
+# Per-year inputs, stored as a struct of arrays: each ASSET_INPUTS field is a
+# (years, assets) array, the split fields are (years, fields) arrays and
+# price_rev_ratio is a (years,) array
+ASSET_INPUTS = ['tvl_units', 'price', 'mgmt_fee', 'perf_fee', 'performance_growth']
+FEE_SPLIT_INPUTS = ['mgmt_dao', 'mgmt_operator', 'perf_dao', 'perf_operator']
+DAO_SPLIT_INPUTS = ['operations', 'buyback', 'revenue_share']
+
+
+def to_arrays(data_by_year):
+    """Convert nested {year: {section: {field: value}}} inputs to arrays"""
+    years = list(data_by_year.values())
+    arrays = {
+        field: np.array([[data[asset][field] for asset in ASSETS] for data in years], dtype=float)
+        for field in ASSET_INPUTS
+    }
+    arrays['fee_split'] = np.array(
+        [[data['fee_split'][field] for field in FEE_SPLIT_INPUTS] for data in years], dtype=float)
+    arrays['dao_split'] = np.array(
+        [[data['dao_split'][field] for field in DAO_SPLIT_INPUTS] for data in years], dtype=float)
+    arrays['price_rev_ratio'] = np.array(
+        [data['valuation']['price_rev_ratio'] for data in years], dtype=float)
+    return arrays
+
+
+def input_matrix(arrays):
+    """Kernel input rows: ASSET_INPUTS per asset, FEE_SPLIT_INPUTS, price_rev_ratio"""
+    per_asset = np.stack([arrays[field] for field in ASSET_INPUTS], axis=2)
+    return np.hstack([
+        per_asset.reshape(per_asset.shape[0], -1),
+        arrays['fee_split'],
+        arrays['price_rev_ratio'][:, None],
+    ])
+
+
+@njit(cache=True)
+def _revenue_kernel(values, n_assets, n_inputs):
+    """
+    Revenue arithmetic for a (years, n_assets * n_inputs + 5) input array
+
+    Each row holds ASSET_INPUTS per asset, then FEE_SPLIT_INPUTS and the
+    price/revenue ratio. Returns (years, assets, RESULT_FIELDS) and
+    (years, SUMMARY_FIELDS) arrays. Sums run left to right, as in sum().
+    """
+    n_years = values.shape[0]
+    per_asset = np.empty((n_years, n_assets, 7))
+    summaries = np.empty((n_years, 13))
+
+    for y in range(n_years):
+        for a in range(n_assets):
+            units = values[y, a * n_inputs]
+            price = values[y, a * n_inputs + 1]
+            mgmt_fee = values[y, a * n_inputs + 2]
+            perf_fee = values[y, a * n_inputs + 3]
+            growth = values[y, a * n_inputs + 4]
+
+            # TVL in USD, management and performance fee revenue
+            tvl_usd = units * price
+            mgmt_revenue_native = units * mgmt_fee
+            mgmt_revenue_usd = mgmt_revenue_native * price
+            perf_revenue_native = units * growth * perf_fee
+            perf_revenue_usd = perf_revenue_native * price
+
+            per_asset[y, a, 0] = tvl_usd
+            per_asset[y, a, 1] = mgmt_revenue_native
+            per_asset[y, a, 2] = mgmt_revenue_usd
+            per_asset[y, a, 3] = perf_revenue_native
+            per_asset[y, a, 4] = perf_revenue_usd
+            per_asset[y, a, 5] = mgmt_revenue_native + perf_revenue_native
+            per_asset[y, a, 6] = mgmt_revenue_usd + perf_revenue_usd
+
+        # Totals across assets, reduced from the rows just written
+        total_tvl = per_asset[y, :, 0].sum()
+        total_mgmt = per_asset[y, :, 2].sum()
+        total_perf = per_asset[y, :, 4].sum()
+
+        # Splits by DAO/Operator
+        splits = n_assets * n_inputs
+        mgmt_dao = total_mgmt * values[y, splits]
+        mgmt_operator = total_mgmt * values[y, splits + 1]
+        perf_dao = total_perf * values[y, splits + 2]
+        perf_operator = total_perf * values[y, splits + 3]
+        price_rev_ratio = values[y, splits + 4]
+
+        total_revenue = total_mgmt + total_perf
+        dao_revenue = mgmt_dao + perf_dao
+        fdv = dao_revenue * price_rev_ratio
+
+        summaries[y, 0] = total_tvl
+        summaries[y, 1] = total_revenue
+        summaries[y, 2] = dao_revenue
+        summaries[y, 3] = mgmt_operator + perf_operator
+        summaries[y, 4] = mgmt_dao
+        summaries[y, 5] = mgmt_operator
+        summaries[y, 6] = perf_dao
+        summaries[y, 7] = perf_operator
+        # Take rates and FDV/TVL are 0 for years without TVL
+        summaries[y, 8] = dao_revenue / total_tvl * 100 if total_tvl > 0 else 0.0
+        summaries[y, 9] = total_revenue / total_tvl * 100 if total_tvl > 0 else 0.0
+        summaries[y, 10] = price_rev_ratio
+        summaries[y, 11] = fdv
+        summaries[y, 12] = fdv / total_tvl if total_tvl > 0 else 0.0
+
+    return per_asset, summaries
+
+
+# Compile (or load the cached build) at import rather than on the first rerun
+_revenue_kernel(np.zeros((1, len(ASSETS) * len(ASSET_INPUTS) + len(FEE_SPLIT_INPUTS) + 1)),
+                len(ASSETS), len(ASSET_INPUTS))
+
+
+@functools.lru_cache(maxsize=32)
+def _calculate_batch(values_bytes, n_years):
+    """
+    Revenue results for an input_matrix() passed as raw float64 bytes
+
+    Memoized on the input bytes; a cache hit costs a bytes hash, which is
+    cheaper than st.cache_data's hashing for a workload this small. Living
+    in an imported module, the cache persists across Streamlit reruns. The
+    returned dicts are shared between calls and must not be modified.
+    """
+    values = np.frombuffer(values_bytes, dtype=float).reshape(n_years, -1)
+    per_asset, summaries = _revenue_kernel(values, len(ASSETS), len(ASSET_INPUTS))
+
+    # Back to plain floats
+    batch = []
+    for assets, summary in zip(per_asset.tolist(), summaries.tolist()):
+        results = {asset: dict(zip(RESULT_FIELDS, row)) for asset, row in zip(ASSETS, assets)}
+        results['summary'] = dict(zip(SUMMARY_FIELDS, summary))
+        batch.append(results)
+    return tuple(batch)
+
+
+def calculate_all_years(arrays, years):
+    """Calculate revenue for every row of the input arrays, keyed by years"""
+    values = np.ascontiguousarray(input_matrix(arrays), dtype=float)
+    return dict(zip(years, _calculate_batch(values.tobytes(), len(years))))
+
+
+@functools.lru_cache(maxsize=64)
+def _calculate_year(inputs):
+    """
+    Revenue results for one year's flat input tuple, in input_matrix() order
+
+    Keyed on the tuple itself, so a repeated live preview skips building the
+    input arrays as well as the kernel call.
+    """
+    return _calculate_batch(np.array([inputs], dtype=float).tobytes(), 1)[0]
+
+
+def calculate_revenue(data):
+    """Calculate revenue for each asset and total"""
+    inputs = (
+        tuple(data[asset][field] for asset in ASSETS for field in ASSET_INPUTS)
+        + tuple(data['fee_split'][field] for field in FEE_SPLIT_INPUTS)
+        + (data['valuation']['price_rev_ratio'],)
+    )
+    return _calculate_year(inputs)